@@ -125,7 +125,7 @@ fi
 echo ""
 echo "Step 3: Running health check..."
 
-if poetry run serper-health-check &> /tmp/health_check.log; then
+if poetry run serper-health-check --deep &> /tmp/health_check.log; then
     pass "System health check passed"
 else
     warn "Health check returned warnings (see /tmp/health_check.log)"
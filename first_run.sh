@@ -162,7 +162,7 @@ fi
 echo ""
 echo "Step 4: Running health check..."
 
-if poetry run serper-health-check --json > /tmp/health_check.json 2>&1; then
+if poetry run serper-health-check --deep --json > /tmp/health_check.json 2>&1; then
     HEALTH_STATUS=$(jq -r '.status' /tmp/health_check.json 2>/dev/null || echo "unknown")
     if [ "$HEALTH_STATUS" == "healthy" ]; then
         pass "System health check: $HEALTH_STATUS"
@@ -0,0 +1,48 @@
+-- 003_partition_serper_jobs.sql
+-- Partitions serper_jobs by DATE(created_at) and clusters it by status, job_id.
+--
+-- Budget checks (src/utils/cost_tracking.py) filter serper_jobs on a
+-- created_at range; on a partitioned table that filter prunes to the days
+-- asked for instead of scanning every job ever created. Clustering serves the
+-- status = 'running' and job_id lookups in src/operations/job_ops.py.
+--
+-- BigQuery cannot add partitioning to an existing table, so this rebuilds it:
+-- the data is copied into a partitioned table, the old table is kept as
+-- serper_jobs_unpartitioned, and the new one takes its name.
+--
+-- Stop all batch processors and job creation before running; writes made
+-- between the copy and the rename would be lost. Not applied automatically by
+-- deploy_and_validate.sh.
+--
+-- Replace {{PROJECT}} / {{DATASET}} before running, then:
+--   bq query --use_legacy_sql=false < sql/migrations/003_partition_serper_jobs.sql
+
+-- Step 1: Empty partitioned copy (LIKE keeps columns, defaults and options)
+CREATE TABLE `{{PROJECT}}.{{DATASET}}.serper_jobs_partitioned`
+LIKE `{{PROJECT}}.{{DATASET}}.serper_jobs`
+PARTITION BY DATE(created_at)
+CLUSTER BY status, job_id;
+
+-- Step 2: Copy existing jobs
+INSERT INTO `{{PROJECT}}.{{DATASET}}.serper_jobs_partitioned`
+SELECT * FROM `{{PROJECT}}.{{DATASET}}.serper_jobs`;
+
+-- Step 3: Swap names, keeping the original as a backup
+ALTER TABLE `{{PROJECT}}.{{DATASET}}.serper_jobs`
+RENAME TO serper_jobs_unpartitioned;
+
+ALTER TABLE `{{PROJECT}}.{{DATASET}}.serper_jobs_partitioned`
+RENAME TO serper_jobs;
+
+-- Verification: row counts must match, and the table must be partitioned
+SELECT
+    (SELECT COUNT(*) FROM `{{PROJECT}}.{{DATASET}}.serper_jobs`) as partitioned_rows,
+    (SELECT COUNT(*) FROM `{{PROJECT}}.{{DATASET}}.serper_jobs_unpartitioned`) as original_rows;
+
+SELECT column_name
+FROM `{{PROJECT}}.{{DATASET}}.INFORMATION_SCHEMA.COLUMNS`
+WHERE table_name = 'serper_jobs' AND is_partitioning_column = 'YES';
+
+-- Expected: partitioned_rows = original_rows, partitioning column created_at.
+-- Once verified, drop the backup:
+--   DROP TABLE `{{PROJECT}}.{{DATASET}}.serper_jobs_unpartitioned`;
@@ -27,6 +27,8 @@ CREATE TABLE IF NOT EXISTS `raw_data.serper_jobs` (
     credits INT64
   >
 )
+PARTITION BY DATE(created_at)
+CLUSTER BY status, job_id
 OPTIONS(
   description = "Job-level metadata and rollup statistics for Serper scraping jobs"
 );
@@ -241,12 +241,17 @@ def health_check_cli():
         action="store_true",
         help="Output health status as JSON"
     )
+    parser.add_argument(
+        "--deep",
+        action="store_true",
+        help="Probe BigQuery with a dataset lookup (default: HEALTHCHECK_DEEP setting)"
+    )
 
     args = parser.parse_args()
 
     try:
         from datetime import datetime
-        health = get_system_health()
+        health = get_system_health(deep=args.deep or None)
         health["timestamp"] = datetime.now(UTC).isoformat()
 
         if args.json:
@@ -22,8 +22,7 @@ from prefect.deployments import run_deployment
 
 from src.models.schemas import JobParams
 from src.tasks.bigquery_tasks import (
-    create_job_task,
-    enqueue_queries_task,
+    bootstrap_job_task,
     get_zips_for_state_task,
 )
 from src.utils.config import settings
@@ -125,13 +124,10 @@ def create_scraping_job(
     else:
         logger.info("Skipping budget check (dry_run=True or use_mock_api=True)")
 
-    # Step 6: Generate unique job_id and create job in BigQuery
+    # Step 6: Generate unique job_id
     job_id = str(uuid.uuid4())
     logger.info(f"Generated job_id: {job_id}")
 
-    logger.info("Creating job in serper_jobs table...")
-    create_job_task(job_id, params)
-
     # Step 7: Generate all query combinations (zip × page)
     logger.info("Generating query details...")
     queries = []
@@ -144,10 +140,10 @@ def create_scraping_job(
             }
             queries.append(query)
 
-    # Step 8: Enqueue all queries in BigQuery
-    logger.info("Enqueuing queries in serper_queries table...")
-    inserted = enqueue_queries_task(job_id, queries)
-    logger.info(f"Enqueued {inserted} queries")
+    # Step 8: Create job and enqueue all queries in one BigQuery script
+    logger.info("Creating job in serper_jobs and enqueuing queries in serper_queries...")
+    bootstrap = bootstrap_job_task(job_id, params, queries)
+    logger.info(f"Enqueued {bootstrap['queries_enqueued']} queries")
 
     # Step 9: Trigger batch processor via Prefect deployment
     logger.info("Triggering batch processor deployment...")
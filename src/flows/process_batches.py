@@ -32,6 +32,7 @@ from src.tasks.bigquery_tasks import (
 )
 from src.tasks.serper_tasks import fetch_serper_place_task
 from src.utils.config import settings
+from src.utils.timing import flush_timing_summary
 
 
 @task(name="process-single-batch-results")
@@ -41,12 +42,15 @@ def process_single_batch_results_task(
     state: str,
     queries: list[dict[str, Any]],
     results: list[dict[str, Any]]
-) -> list[dict[str, Any]]:
-    """Process API results: update query statuses, extract places, handle early exit.
+) -> dict[str, int]:
+    """Process API results: extract and store places, update query statuses, handle early exit.
 
     OPTIMIZED VERSION: Uses batched BigQuery operations to dramatically improve performance.
     Instead of N sequential database calls (2-5s each), this makes 2 batched calls (~2.5s total).
 
+    The places MERGE (serper_places) is submitted before the status MERGEs
+    (serper_queries) so the two round-trips overlap instead of running back to back.
+
     Args:
         job_id: Job identifier
         keyword: Search keyword
@@ -55,7 +59,10 @@ def process_single_batch_results_task(
         results: API responses from Serper (or mock)
 
     Returns:
-        List of place records ready for storage
+        {
+            "places_extracted": 47,
+            "places_stored": 45
+        }
     """
     logger = get_run_logger()
     places_to_store = []
@@ -122,17 +129,44 @@ def process_single_batch_results_task(
     # Before: 20 queries × 2.5s = 50s
     # After: 2 batched calls × 2.5s = 5s
 
-    logger.info(f"Batch updating {len(status_updates)} query statuses...")
-    updated_count = batch_update_query_statuses_task(job_id, status_updates)
-    logger.info(f"Updated {updated_count} query statuses")
+    # Start storing places in the background; it targets a different table than the
+    # status updates below, so the MERGEs can run concurrently without contention
+    store_future = None
+    if places_to_store:
+        logger.info(f"Storing {len(places_to_store)} places for job {job_id}...")
+        store_future = store_places_task.submit(job_id, places_to_store)
+    else:
+        logger.info("No places to store")
 
-    if zips_to_skip:
-        logger.info(f"Batch skipping pages 2-3 for {len(zips_to_skip)} zips...")
-        skipped_count = batch_skip_remaining_pages_task(job_id, zips_to_skip)
-        logger.info(f"Skipped {skipped_count} queries (early exit optimization)")
+    try:
+        logger.info(f"Batch updating {len(status_updates)} query statuses...")
+        updated_count = batch_update_query_statuses_task(job_id, status_updates)
+        logger.info(f"Updated {updated_count} query statuses")
+
+        if zips_to_skip:
+            logger.info(f"Batch skipping pages 2-3 for {len(zips_to_skip)} zips...")
+            skipped_count = batch_skip_remaining_pages_task(job_id, zips_to_skip)
+            logger.info(f"Skipped {skipped_count} queries (early exit optimization)")
+    finally:
+        # Settle the place storage even when a status/skip MERGE raises, so its
+        # outcome is logged before the batch is reset rather than lost
+        if store_future:
+            store_future.wait()
+            if store_future.state.is_failed():
+                logger.error(
+                    f"Storing places for job {job_id} failed: {store_future.state.message}"
+                )
+
+    # Wait for the overlapped place storage to finish (re-raises on failure)
+    stored_count = store_future.result() if store_future else 0
+    if store_future:
+        logger.info(f"Stored {stored_count} new places")
 
     logger.info(f"Processed {len(queries)} queries, extracted {len(places_to_store)} places")
-    return places_to_store
+    return {
+        "places_extracted": len(places_to_store),
+        "places_stored": stored_count
+    }
 
 
 @task(name="process-single-batch")
@@ -182,8 +216,9 @@ def process_single_batch(
         # Step 2: Process queries in parallel using .map()
         results = fetch_serper_place_task.map(queries)
 
-        # Step 3: Process results - update statuses, extract places, handle early exit
-        places = process_single_batch_results_task(
+        # Step 3: Process results - store places and update statuses (overlapped),
+        # handle early exit
+        batch_stats = process_single_batch_results_task(
             job_id=job_id,
             keyword=keyword,
             state=state,
@@ -191,21 +226,12 @@ def process_single_batch(
             results=results
         )
 
-        # Step 4: Store places in BigQuery
-        if places:
-            logger.info(f"Storing {len(places)} places for job {job_id}...")
-            stored_count = store_places_task(job_id, places)
-            logger.info(f"Stored {stored_count} new places")
-        else:
-            logger.info("No places to store")
-            stored_count = 0
-
-        # Step 5: Update job statistics
+        # Step 4: Update job statistics (after both writes have landed)
         update_job_stats_task(job_id)
 
         return {
             "queries_processed": len(queries),
-            "places_stored": stored_count,
+            "places_stored": batch_stats["places_stored"],
             "batch_failed": False
         }
 
@@ -313,46 +339,53 @@ def process_job_batches() -> dict[str, Any]:
 
     logger.info("Starting batch processor...")
 
-    while True:
-        # Step 1: Find all running jobs
-        running_jobs = get_running_jobs_task()
-
-        if not running_jobs:
-            logger.info("No running jobs found - exiting processor")
-            break
-
-        logger.info(f"Found {len(running_jobs)} running job(s)")
-
-        # Step 2: Process one batch for EACH running job IN PARALLEL
-        # Extract parameters into lists for .map()
-        job_ids = [job["job_id"] for job in running_jobs]
-        keywords = [job["keyword"] for job in running_jobs]
-        states = [job["state"] for job in running_jobs]
-        batch_sizes = [job["batch_size"] for job in running_jobs]
-
-        logger.info(f"Processing batches for {len(running_jobs)} jobs in parallel...")
+    try:
+        while True:
+            # Step 1: Find all running jobs
+            running_jobs = get_running_jobs_task()
+
+            if not running_jobs:
+                logger.info("No running jobs found - exiting processor")
+                break
+
+            logger.info(f"Found {len(running_jobs)} running job(s)")
+
+            # Step 2: Process one batch for EACH running job IN PARALLEL
+            # Extract parameters into lists for .map()
+            job_ids = [job["job_id"] for job in running_jobs]
+            keywords = [job["keyword"] for job in running_jobs]
+            states = [job["state"] for job in running_jobs]
+            batch_sizes = [job["batch_size"] for job in running_jobs]
+
+            logger.info(f"Processing batches for {len(running_jobs)} jobs in parallel...")
+
+            # Process all jobs in parallel using .map()
+            # This is the KEY PERFORMANCE FIX: jobs no longer wait in line
+            batch_results = process_single_batch.map(
+                job_id=job_ids,
+                keyword=keywords,
+                state=states,
+                batch_size=batch_sizes
+            )
 
-        # Process all jobs in parallel using .map()
-        # This is the KEY PERFORMANCE FIX: jobs no longer wait in line
-        batch_results = process_single_batch.map(
-            job_id=job_ids,
-            keyword=keywords,
-            state=states,
-            batch_size=batch_sizes
-        )
+            # Step 3: Process results and track statistics
+            # Pass futures to task - Prefect auto-resolves them
+            iteration_stats = process_batch_results_and_track_stats(running_jobs, batch_results)
 
-        # Step 3: Process results and track statistics
-        # Pass futures to task - Prefect auto-resolves them
-        iteration_stats = process_batch_results_and_track_stats(running_jobs, batch_results)
+            # Update totals
+            total_batches += iteration_stats["tracked_batches"]
+            total_queries += iteration_stats["tracked_queries"]
+            completed_jobs.extend(iteration_stats["completed_jobs"])
 
-        # Update totals
-        total_batches += iteration_stats["tracked_batches"]
-        total_queries += iteration_stats["tracked_queries"]
-        completed_jobs.extend(iteration_stats["completed_jobs"])
+            # Emit aggregated timing stats for this iteration (no-op unless TIMING_AGGREGATE)
+            flush_timing_summary()
 
-        # Step 4: Rate limiting delay between iterations
-        logger.info(f"Waiting {settings.processor_loop_delay_seconds}s before next iteration...")
-        time.sleep(settings.processor_loop_delay_seconds)
+            # Step 4: Rate limiting delay between iterations
+            logger.info(f"Waiting {settings.processor_loop_delay_seconds}s before next iteration...")
+            time.sleep(settings.processor_loop_delay_seconds)
+    finally:
+        # Flush samples left from the last iteration (or an aborted one)
+        flush_timing_summary()
 
     # Calculate runtime
     end_time = datetime.now(UTC)
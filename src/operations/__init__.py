@@ -11,10 +11,15 @@ Operations are organized internally into three modules:
 
 # Job operations
 from src.operations.job_ops import (
+    bootstrap_job,
+    clear_mark_job_done_cache,
+    clear_zips_for_state_cache,
     create_job,
+    create_jobs,
     get_job_stats,
     get_job_status,
     get_running_jobs,
+    get_running_jobs_with_status,
     get_zips_for_state,
     mark_job_done,
     update_job_stats,
@@ -36,10 +41,15 @@ from src.operations.query_ops import (
 
 __all__ = [
     # Job operations
+    "bootstrap_job",
+    "clear_mark_job_done_cache",
+    "clear_zips_for_state_cache",
     "create_job",
+    "create_jobs",
     "get_job_stats",
     "get_job_status",
     "get_running_jobs",
+    "get_running_jobs_with_status",
     "get_zips_for_state",
     "mark_job_done",
     "update_job_stats",
@@ -2,22 +2,131 @@
 
 This module handles job CRUD operations:
 - create_job: Insert new jobs
+- create_jobs: Insert many jobs with one multi-row INSERT per chunk
+- bootstrap_job: Insert a job and enqueue its queries in one scripted call
 - get_job_status: Retrieve job metadata
 - get_job_stats: Retrieve rollup statistics
 - update_job_stats: Recalculate aggregated statistics
-- mark_job_done: Mark job as completed
+- mark_job_done: Mark job as completed (repeat calls within a short TTL are skipped)
 - get_running_jobs: List active jobs
-- get_zips_for_state: Reference data for job planning
+- get_running_jobs_with_status: List active jobs with full status (one query)
+- get_zips_for_state: Reference data for job planning (cached per process)
+- clear_zips_for_state_cache: Drop this process's cached reference data
 """
 
+import threading
+import time
+from collections import OrderedDict
 from datetime import UTC, datetime
+from functools import cache, lru_cache
 from typing import Any
 
 from google.cloud import bigquery
 
 from src.models.schemas import JobParams
-from src.utils.bigquery_client import execute_dml, execute_query
-from src.utils.config import settings
+from src.operations.query_ops import MERGE_CHUNK_SIZE
+from src.utils.bigquery_client import execute_dml, execute_query, submit_dml
+from src.utils.config import (
+    GEO_ZIP_TABLE,
+    SERPER_JOBS_TABLE,
+    SERPER_PLACES_TABLE,
+    SERPER_QUERIES_TABLE,
+)
+
+# BigQuery rejects queries with more than 10,000 parameters
+MAX_QUERY_PARAMETERS = 10_000
+
+# (name, type) of the scalar parameters bound for each new serper_jobs row,
+# in VALUES column order (see _job_values_sql / _job_insert_params)
+_JOB_PARAM_FIELDS = (
+    ("job_id", "STRING"),
+    ("keyword", "STRING"),
+    ("state", "STRING"),
+    ("pages", "INT64"),
+    ("dry_run", "BOOL"),
+    ("batch_size", "INT64"),
+    ("concurrency", "INT64"),
+)
+_PARAMS_PER_JOB_ROW = len(_JOB_PARAM_FIELDS)
+
+# Max jobs per multi-row INSERT in create_jobs: 500 rows (3,500 parameters),
+# never more than the parameter limit allows
+INSERT_CHUNK_SIZE = min(500, MAX_QUERY_PARAMETERS // _PARAMS_PER_JOB_ROW)
+
+# Jobs this process recently marked done: job_id -> monotonic time of the UPDATE.
+# 'done' is terminal, so a repeat mark within the TTL (e.g. a retried task or a
+# poll-then-mark loop) is skipped instead of re-running the UPDATE.
+MARK_DONE_TTL_SECONDS = 60.0
+_MARK_DONE_CACHE_SIZE = 1024
+_recently_marked_done: OrderedDict[str, float] = OrderedDict()
+# mark_job_done runs from ConcurrentTaskRunner threads; the lock covers lookups,
+# reordering and eviction, never the UPDATE itself
+_recently_marked_done_lock = threading.Lock()
+
+# Row type for the @queries_<i> ARRAY<STRUCT> parameters of bootstrap_job
+_QUERY_STRUCT_TYPE = bigquery.StructQueryParameterType(
+    bigquery.ScalarQueryParameterType("STRING", name="zip"),
+    bigquery.ScalarQueryParameterType("INT64", name="page"),
+    bigquery.ScalarQueryParameterType("STRING", name="q"),
+)
+
+
+def _job_values_sql(suffix: str = "") -> str:
+    """Internal helper: VALUES row for one new serper_jobs row.
+
+    Parameter names carry the suffix (e.g. "_3" -> @job_id_3) so several rows
+    can share one INSERT statement.
+    """
+    placeholders = "".join(f"@{name}{suffix},\n        " for name, _ in _JOB_PARAM_FIELDS)
+    return f"""(
+        {placeholders}'running',
+        CURRENT_TIMESTAMP(),
+        CURRENT_TIMESTAMP(),
+        STRUCT(0 AS zips, 0 AS queries, 0 AS successes, 0 AS failures, 0 AS places, 0 AS credits)
+    )"""
+
+
+def _job_insert_params(
+    job_id: str,
+    params: JobParams,
+    suffix: str = ""
+) -> list[bigquery.ScalarQueryParameter]:
+    """Internal helper: parameters for a _job_values_sql(suffix) row."""
+    values: tuple[str | int | bool, ...] = (
+        job_id,
+        params.keyword,
+        params.state,
+        params.pages,
+        params.dry_run,
+        params.batch_size,
+        params.concurrency,
+    )
+    return [
+        bigquery.ScalarQueryParameter(f"{name}{suffix}", type_, value)
+        for (name, type_), value in zip(_JOB_PARAM_FIELDS, values, strict=True)
+    ]
+
+
+def _insert_jobs_sql(values_rows: list[str]) -> str:
+    """Internal helper: INSERT statement for one or more VALUES rows."""
+    values_sql = ",\n    ".join(values_rows)
+    return f"""
+    INSERT INTO {SERPER_JOBS_TABLE}
+    (job_id, keyword, state, pages, dry_run, batch_size, concurrency, status, created_at, started_at, totals)
+    VALUES {values_sql}
+    """
+
+
+# The statement text only depends on the table and the row count, so build it
+# once: create_job always sends _INSERT_JOB_SQL, and create_jobs reuses one
+# string per chunk size (full chunks plus at most a few distinct tails)
+_INSERT_JOB_SQL = _insert_jobs_sql([_job_values_sql()])
+
+
+@lru_cache(maxsize=32)
+def _insert_jobs_bulk_sql(num_rows: int) -> str:
+    """Internal helper: INSERT for num_rows rows suffixed _0 .. _{num_rows - 1}."""
+    return _insert_jobs_sql([_job_values_sql(f"_{i}") for i in range(num_rows)])
 
 
 def create_job(job_id: str, params: JobParams) -> dict[str, Any]:
@@ -33,46 +142,155 @@ def create_job(job_id: str, params: JobParams) -> dict[str, Any]:
     Raises:
         google.cloud.exceptions.GoogleCloudError: If insert fails
     """
-    query = f"""
-    INSERT INTO `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_jobs`
-    (job_id, keyword, state, pages, dry_run, batch_size, concurrency, status, created_at, started_at, totals)
-    VALUES (
-        @job_id,
-        @keyword,
-        @state,
-        @pages,
-        @dry_run,
-        @batch_size,
-        @concurrency,
-        'running',
-        CURRENT_TIMESTAMP(),
-        CURRENT_TIMESTAMP(),
-        STRUCT(0 AS zips, 0 AS queries, 0 AS successes, 0 AS failures, 0 AS places, 0 AS credits)
-    )
+    execute_dml(_INSERT_JOB_SQL, _job_insert_params(job_id, params))
+
+    return {
+        "job_id": job_id,
+        "status": "running",
+        "created_at": datetime.now(UTC).isoformat()
+    }
+
+
+def create_jobs(jobs: list[tuple[str, JobParams]]) -> list[dict[str, Any]]:
+    """Create several scraping jobs with one multi-row INSERT per chunk.
+
+    Equivalent to calling create_job() for each job, but rows are sent
+    INSERT_CHUNK_SIZE at a time, so N jobs cost one DML job per chunk instead
+    of one each. Chunks are separate statements: if a later chunk fails, the
+    jobs from earlier chunks are already created.
+
+    Args:
+        jobs: (job_id, params) pairs, one per job to create
+
+    Returns:
+        One dict per job (same format as create_job), in the order given
+
+    Raises:
+        google.cloud.exceptions.GoogleCloudError: If an insert fails
     """
+    # Page the input so no single INSERT exceeds MAX_QUERY_PARAMETERS
+    for i in range(0, len(jobs), INSERT_CHUNK_SIZE):
+        chunk = jobs[i:i + INSERT_CHUNK_SIZE]
 
-    parameters = [
-        bigquery.ScalarQueryParameter("job_id", "STRING", job_id),
-        bigquery.ScalarQueryParameter("keyword", "STRING", params.keyword),
-        bigquery.ScalarQueryParameter("state", "STRING", params.state),
-        bigquery.ScalarQueryParameter("pages", "INT64", params.pages),
-        bigquery.ScalarQueryParameter("dry_run", "BOOL", params.dry_run),
-        bigquery.ScalarQueryParameter("batch_size", "INT64", params.batch_size),
-        bigquery.ScalarQueryParameter("concurrency", "INT64", params.concurrency),
+        parameters = []
+        for j, (job_id, params) in enumerate(chunk):
+            parameters.extend(_job_insert_params(job_id, params, suffix=f"_{j}"))
+
+        execute_dml(_insert_jobs_bulk_sql(len(chunk)), parameters)
+
+    created_at = datetime.now(UTC).isoformat()
+    return [
+        {"job_id": job_id, "status": "running", "created_at": created_at}
+        for job_id, _ in jobs
+    ]
+
+
+@lru_cache(maxsize=32)
+def _bootstrap_job_sql(num_chunks: int) -> str:
+    """Internal helper: bootstrap_job script for num_chunks @queries_<i> arrays.
+
+    The MERGE row counts are summed into a DECLAREd variable inside the
+    transaction and returned by a SELECT after COMMIT.
+    """
+    merges = "".join(f"""
+    MERGE {SERPER_QUERIES_TABLE} AS target
+    USING (
+        SELECT @job_id AS job_id, q.zip, q.page, q.q
+        FROM UNNEST(@queries_{i}) AS q
+    ) AS source
+    ON target.job_id = source.job_id
+       AND target.zip = source.zip
+       AND target.page = source.page
+    WHEN NOT MATCHED THEN
+        INSERT (job_id, zip, page, q, status)
+        VALUES (source.job_id, source.zip, source.page, source.q, 'queued');
+
+    SET queries_enqueued = queries_enqueued + @@row_count;
+""" for i in range(num_chunks))
+
+    return f"""
+    DECLARE queries_enqueued INT64 DEFAULT 0;
+
+    BEGIN TRANSACTION;
+    {_INSERT_JOB_SQL.strip()};
+    {merges}
+    COMMIT TRANSACTION;
+
+    SELECT queries_enqueued;
+    """
+
+
+def bootstrap_job(
+    job_id: str,
+    params: JobParams,
+    queries: list[dict[str, Any]]
+) -> dict[str, Any]:
+    """Create a job and enqueue all of its queries in a single BigQuery script.
+
+    Equivalent to create_job() followed by enqueue_queries(), but submitted as
+    one multi-statement transaction: one round-trip instead of one per step,
+    and the job row never exists without its queue. The queue insert is an
+    idempotent MERGE on (job_id, zip, page), like enqueue_queries().
+
+    Args:
+        job_id: Unique identifier for the job (UUID recommended)
+        params: Validated job parameters
+        queries: List of query dicts with keys: zip, page, q
+
+    Returns:
+        Dict containing job_id, status, created_at, and queries_enqueued
+        (number of new queries inserted)
+
+    Raises:
+        google.cloud.exceptions.GoogleCloudError: If the script fails
+            (the transaction is rolled back)
+    """
+    # Each chunk of queries is its own @queries_<i> array and MERGE, paged like
+    # enqueue_queries so no single parameter grows without bound
+    chunks = [
+        queries[start:start + MERGE_CHUNK_SIZE]
+        for start in range(0, len(queries), MERGE_CHUNK_SIZE)
     ]
 
-    execute_dml(query, parameters)
+    parameters: list[bigquery.query._AbstractQueryParameter] = [
+        *_job_insert_params(job_id, params)
+    ]
+    for i, chunk in enumerate(chunks):
+        parameters.append(bigquery.ArrayQueryParameter(
+            f"queries_{i}",
+            _QUERY_STRUCT_TYPE,
+            [
+                bigquery.StructQueryParameter(
+                    None,
+                    bigquery.ScalarQueryParameter("zip", "STRING", q["zip"]),
+                    bigquery.ScalarQueryParameter("page", "INT64", q["page"]),
+                    bigquery.ScalarQueryParameter("q", "STRING", q["q"]),
+                )
+                for q in chunk
+            ],
+        ))
+
+    # A write script: submit without the result cache, then read the final
+    # SELECT, which runs after COMMIT so it is the script's last statement
+    script_job = submit_dml(_bootstrap_job_sql(len(chunks)), parameters)
+    row = next(iter(script_job.result()), None)
 
     return {
         "job_id": job_id,
         "status": "running",
-        "created_at": datetime.now(UTC).isoformat()
+        "created_at": datetime.now(UTC).isoformat(),
+        "queries_enqueued": row.queries_enqueued if row else 0
     }
 
 
 def get_zips_for_state(state: str) -> list[str]:
     """Retrieve all zip codes for a given state from reference table.
 
+    Results are cached for the life of the process: the reference table
+    changes rarely, so repeated job starts for the same state skip the
+    BigQuery round-trip. After the reference table is reloaded, restart the
+    workers to pick up the new zip codes.
+
     Args:
         state: Two-letter state code (e.g., 'AZ', 'CA')
 
@@ -82,19 +300,31 @@ def get_zips_for_state(state: str) -> list[str]:
     Raises:
         google.cloud.exceptions.GoogleCloudError: If query fails
     """
+    # Return a fresh list so callers can't mutate the cached result
+    return list(_get_zips_for_state_cached(state.upper()))
+
+
+@cache
+def _get_zips_for_state_cached(state: str) -> tuple[str, ...]:
+    """Internal helper: query zip codes for an uppercased state code (cached)."""
     query = f"""
     SELECT DISTINCT zip
-    FROM `{settings.bigquery_project_id}.reference.geo_zip_all`
+    FROM {GEO_ZIP_TABLE}
     WHERE state = @state
     ORDER BY zip
     """
 
     parameters = [
-        bigquery.ScalarQueryParameter("state", "STRING", state.upper())
+        bigquery.ScalarQueryParameter("state", "STRING", state)
     ]
 
     results = execute_query(query, parameters)
-    return [row.zip for row in results]
+    return tuple(row.zip for row in results)
+
+
+def clear_zips_for_state_cache() -> None:
+    """Clear this process's cached get_zips_for_state results."""
+    _get_zips_for_state_cached.cache_clear()
 
 
 def update_job_stats(job_id: str) -> dict[str, int]:
@@ -113,14 +343,14 @@ def update_job_stats(job_id: str) -> dict[str, int]:
         google.cloud.exceptions.GoogleCloudError: If update fails
     """
     update_query = f"""
-    UPDATE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_jobs`
+    UPDATE {SERPER_JOBS_TABLE}
     SET totals = STRUCT(
-        (SELECT COUNT(DISTINCT zip) FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries` WHERE job_id = @job_id) AS zips,
-        (SELECT COUNT(*) FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries` WHERE job_id = @job_id) AS queries,
-        (SELECT COUNT(*) FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries` WHERE job_id = @job_id AND status = 'success') AS successes,
-        (SELECT COUNT(*) FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries` WHERE job_id = @job_id AND status = 'failed') AS failures,
-        (SELECT COUNT(*) FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_places` WHERE job_id = @job_id) AS places,
-        (SELECT COALESCE(SUM(credits), 0) FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries` WHERE job_id = @job_id) AS credits
+        (SELECT COUNT(DISTINCT zip) FROM {SERPER_QUERIES_TABLE} WHERE job_id = @job_id) AS zips,
+        (SELECT COUNT(*) FROM {SERPER_QUERIES_TABLE} WHERE job_id = @job_id) AS queries,
+        (SELECT COUNT(*) FROM {SERPER_QUERIES_TABLE} WHERE job_id = @job_id AND status = 'success') AS successes,
+        (SELECT COUNT(*) FROM {SERPER_QUERIES_TABLE} WHERE job_id = @job_id AND status = 'failed') AS failures,
+        (SELECT COUNT(*) FROM {SERPER_PLACES_TABLE} WHERE job_id = @job_id) AS places,
+        (SELECT COALESCE(SUM(credits), 0) FROM {SERPER_QUERIES_TABLE} WHERE job_id = @job_id) AS credits
     )
     WHERE job_id = @job_id
     """
@@ -149,7 +379,7 @@ def get_job_stats(job_id: str) -> dict[str, int]:
     """
     query = f"""
     SELECT totals
-    FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_jobs`
+    FROM {SERPER_JOBS_TABLE}
     WHERE job_id = @job_id
     """
 
@@ -200,7 +430,7 @@ def get_job_status(job_id: str) -> dict[str, Any]:
         started_at,
         finished_at,
         totals
-    FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_jobs`
+    FROM {SERPER_JOBS_TABLE}
     WHERE job_id = @job_id
     """
 
@@ -214,6 +444,11 @@ def get_job_status(job_id: str) -> dict[str, Any]:
     if not row:
         raise ValueError(f"Job not found: {job_id}")
 
+    return _job_status_from_row(row)
+
+
+def _job_status_from_row(row: Any) -> dict[str, Any]:
+    """Internal helper: convert a serper_jobs status row to the get_job_status dict."""
     totals = row.totals
     return {
         "job_id": row.job_id,
@@ -257,7 +492,7 @@ def get_running_jobs() -> list[dict[str, Any]]:
         pages,
         batch_size,
         concurrency
-    FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_jobs`
+    FROM {SERPER_JOBS_TABLE}
     WHERE status = 'running'
     ORDER BY created_at ASC
     """
@@ -278,10 +513,48 @@ def get_running_jobs() -> list[dict[str, Any]]:
     return jobs
 
 
+def get_running_jobs_with_status() -> list[dict[str, Any]]:
+    """Retrieve complete status information for all jobs with status='running'.
+
+    Single-query replacement for calling get_running_jobs() and then
+    get_job_status() once per job (N+1 round-trips).
+
+    Returns:
+        List of dicts in the get_job_status() format, oldest job first
+
+    Raises:
+        google.cloud.exceptions.GoogleCloudError: If query fails
+    """
+    query = f"""
+    SELECT
+        job_id,
+        keyword,
+        state,
+        pages,
+        dry_run,
+        concurrency,
+        status,
+        created_at,
+        started_at,
+        finished_at,
+        totals
+    FROM {SERPER_JOBS_TABLE}
+    WHERE status = 'running'
+    ORDER BY created_at ASC
+    """
+
+    results = execute_query(query, parameters=None)
+    return [_job_status_from_row(row) for row in results]
+
+
 def mark_job_done(job_id: str) -> None:
     """Mark a job as completed.
 
-    Updates job status to 'done' and sets finished_at timestamp.
+    Updates job status to 'done' and sets finished_at timestamp. Calling it
+    again for the same job within MARK_DONE_TTL_SECONDS is a no-op, so
+    duplicate marks cost no BigQuery round-trip. A job is remembered only
+    once its UPDATE succeeds and matches a row; an unknown job_id, or a job
+    row not yet visible, is retried on the next call.
 
     Args:
         job_id: Job identifier
@@ -289,8 +562,13 @@ def mark_job_done(job_id: str) -> None:
     Raises:
         google.cloud.exceptions.GoogleCloudError: If update fails
     """
+    with _recently_marked_done_lock:
+        marked_at = _recently_marked_done.get(job_id)
+    if marked_at is not None and time.monotonic() - marked_at < MARK_DONE_TTL_SECONDS:
+        return
+
     update_query = f"""
-    UPDATE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_jobs`
+    UPDATE {SERPER_JOBS_TABLE}
     SET
         status = 'done',
         finished_at = CURRENT_TIMESTAMP()
@@ -301,4 +579,18 @@ def mark_job_done(job_id: str) -> None:
         bigquery.ScalarQueryParameter("job_id", "STRING", job_id)
     ]
 
-    execute_dml(update_query, parameters)
+    rows_updated = execute_dml(update_query, parameters)
+    if rows_updated == 0:
+        return
+
+    with _recently_marked_done_lock:
+        _recently_marked_done[job_id] = time.monotonic()
+        _recently_marked_done.move_to_end(job_id)
+        if len(_recently_marked_done) > _MARK_DONE_CACHE_SIZE:
+            _recently_marked_done.popitem(last=False)
+
+
+def clear_mark_job_done_cache() -> None:
+    """Forget which jobs were recently marked done, so the next mark re-runs the UPDATE."""
+    with _recently_marked_done_lock:
+        _recently_marked_done.clear()
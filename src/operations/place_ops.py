@@ -5,20 +5,21 @@ This module handles place persistence:
 - _store_places_chunk: Internal helper for chunked operations
 """
 
-import json
 import time
 from datetime import UTC, datetime
 from typing import Any
 
+import orjson
 from google.cloud import bigquery
 
 from src.utils.bigquery_client import execute_dml
-from src.utils.config import settings
+from src.utils.config import SERPER_PLACES_TABLE
 from src.utils.timing import timing
 
 # BigQuery MERGE operation limits
 # Safe chunk size to avoid hitting parameter limits (10000 params max)
-# With ~10 params per row, 500 rows = ~5000 params (50% safety margin)
+# With 14 params per row plus 3 shared, 500 rows = 7003 params (30% safety
+# margin, which also bounds request size given each row's two payload copies)
 MERGE_CHUNK_SIZE = 500
 
 
@@ -53,7 +54,7 @@ def _store_places_chunk(job_id: str, places: list[dict[str, Any]]) -> int:
             "page": place["page"],
             "place_uid": place["place_uid"],
             "payload": place["payload"],
-            "payload_raw": json.dumps(place["payload"], ensure_ascii=False),
+            "payload_raw": orjson.dumps(place["payload"]).decode("utf-8"),
             "api_status": place.get("api_status"),
             "api_ms": place.get("api_ms"),
             "results_count": place.get("results_count"),
@@ -75,7 +76,7 @@ def _store_places_chunk(job_id: str, places: list[dict[str, Any]]) -> int:
     values_sql = ",\n        ".join(values_clauses)
 
     merge_query = f"""
-    MERGE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_places` AS target
+    MERGE {SERPER_PLACES_TABLE} AS target
     USING (
         SELECT * FROM UNNEST([
             STRUCT<ingest_id STRING, job_id STRING, source STRING, source_version STRING,
@@ -121,7 +122,7 @@ def _store_places_chunk(job_id: str, places: list[dict[str, Any]]) -> int:
             bigquery.ScalarQueryParameter(f"error_{i}", "STRING", row.get("error")),
         ])
 
-    with timing(f"MERGE store {len(places)} places"):
+    with timing(f"MERGE store {len(places)} places", label="MERGE store places"):
         rows_affected = execute_dml(merge_query, parameters)
     return rows_affected
 
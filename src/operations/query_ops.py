@@ -17,7 +17,7 @@ from typing import Any
 from google.cloud import bigquery
 
 from src.utils.bigquery_client import execute_dml, execute_query
-from src.utils.config import settings
+from src.utils.config import SERPER_QUERIES_TABLE
 from src.utils.timing import timing
 
 # BigQuery MERGE operation limits
@@ -25,6 +25,55 @@ from src.utils.timing import timing
 # With ~10 params per row, 500 rows = ~5000 params (50% safety margin)
 MERGE_CHUNK_SIZE = 500
 
+# Row type for the @updates ARRAY<STRUCT> parameter of batch_update_query_statuses.
+# Sending all rows as one struct-array parameter keeps the request to a single
+# parameter instead of 7 scalar parameters per row.
+_STATUS_UPDATE_STRUCT_FIELDS = (
+    ("zip", "STRING"),
+    ("page", "INT64"),
+    ("status", "STRING"),
+    ("api_status", "INT64"),
+    ("results_count", "INT64"),
+    ("credits", "INT64"),
+    ("error", "STRING"),
+)
+# Fields every update must carry; the rest default to NULL when absent
+_STATUS_UPDATE_REQUIRED_FIELDS = frozenset({"zip", "page", "status"})
+_STATUS_UPDATE_STRUCT_TYPE = bigquery.StructQueryParameterType(
+    *(bigquery.ScalarQueryParameterType(type_, name=name)
+      for name, type_ in _STATUS_UPDATE_STRUCT_FIELDS)
+)
+
+# MERGE for batch_update_query_statuses. The text does not depend on batch size
+# (rows arrive via @updates), so it is built once at import and is byte-identical
+# across calls.
+_BATCH_UPDATE_STATUSES_SQL = f"""
+MERGE {SERPER_QUERIES_TABLE} AS target
+USING (
+    SELECT
+        @job_id AS job_id,
+        u.zip,
+        u.page,
+        u.status,
+        u.api_status,
+        u.results_count,
+        u.credits,
+        u.error
+    FROM UNNEST(@updates) AS u
+) AS source
+ON target.job_id = source.job_id
+   AND target.zip = source.zip
+   AND target.page = source.page
+WHEN MATCHED THEN
+    UPDATE SET
+        status = source.status,
+        api_status = source.api_status,
+        results_count = source.results_count,
+        credits = source.credits,
+        error = source.error,
+        ran_at = CURRENT_TIMESTAMP()
+"""
+
 
 def _enqueue_queries_chunk(job_id: str, queries: list[dict[str, Any]]) -> int:
     """Internal helper: enqueue a single chunk of queries (<=500 rows).
@@ -52,7 +101,7 @@ def _enqueue_queries_chunk(job_id: str, queries: list[dict[str, Any]]) -> int:
     values_sql = ",\n        ".join(values_clauses)
 
     query = f"""
-    MERGE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries` AS target
+    MERGE {SERPER_QUERIES_TABLE} AS target
     USING (
         SELECT * FROM UNNEST([
             STRUCT<job_id STRING, zip STRING, page INT64, q STRING, status STRING,
@@ -80,7 +129,7 @@ def _enqueue_queries_chunk(job_id: str, queries: list[dict[str, Any]]) -> int:
             bigquery.ScalarQueryParameter(f"q_{i}", "STRING", q["q"]),
         ])
 
-    with timing(f"MERGE enqueue {len(queries)} queries"):
+    with timing(f"MERGE enqueue {len(queries)} queries", label="MERGE enqueue queries"):
         rows_affected = execute_dml(query, parameters)
     return rows_affected
 
@@ -146,7 +195,7 @@ def dequeue_batch(job_id: str, batch_size: int) -> list[dict[str, Any]]:
 
     # Step 1: Atomically claim a batch of queued queries
     update_query = f"""
-    UPDATE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries`
+    UPDATE {SERPER_QUERIES_TABLE}
     SET
         status = 'processing',
         claim_id = @claim_id,
@@ -157,7 +206,7 @@ def dequeue_batch(job_id: str, batch_size: int) -> list[dict[str, Any]]:
           SELECT CONCAT(zip, '-', CAST(page AS STRING))
           FROM (
               SELECT zip, page, ROW_NUMBER() OVER (ORDER BY zip, page) AS rn
-              FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries`
+              FROM {SERPER_QUERIES_TABLE}
               WHERE job_id = @job_id AND status = 'queued'
           )
           WHERE rn <= @batch_size
@@ -170,7 +219,7 @@ def dequeue_batch(job_id: str, batch_size: int) -> list[dict[str, Any]]:
         bigquery.ScalarQueryParameter("batch_size", "INT64", batch_size),
     ]
 
-    with timing(f"Atomic claim batch (size={batch_size})"):
+    with timing(f"Atomic claim batch (size={batch_size})", label="Atomic claim batch"):
         claimed_count = execute_dml(update_query, update_params)
 
     if claimed_count == 0:
@@ -179,7 +228,7 @@ def dequeue_batch(job_id: str, batch_size: int) -> list[dict[str, Any]]:
     # Step 2: SELECT only queries with our claim_id
     select_query = f"""
     SELECT zip, page, q, claim_id
-    FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries`
+    FROM {SERPER_QUERIES_TABLE}
     WHERE job_id = @job_id AND claim_id = @claim_id
     ORDER BY zip, page
     """
@@ -189,7 +238,9 @@ def dequeue_batch(job_id: str, batch_size: int) -> list[dict[str, Any]]:
         bigquery.ScalarQueryParameter("claim_id", "STRING", claim_id),
     ]
 
-    with timing(f"SELECT claimed queries (expected={claimed_count})"):
+    with timing(
+        f"SELECT claimed queries (expected={claimed_count})", label="SELECT claimed queries"
+    ):
         results = execute_query(select_query, select_params)
 
     return [
@@ -236,7 +287,7 @@ def skip_remaining_pages(
 
     # Mark pages 2 and 3 as skipped
     update_query = f"""
-    UPDATE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries`
+    UPDATE {SERPER_QUERIES_TABLE}
     SET
         status = 'skipped',
         error = 'early_exit_page1_lt10',
@@ -282,7 +333,7 @@ def update_query_status(
         google.cloud.exceptions.GoogleCloudError: If update fails
     """
     update_query = f"""
-    UPDATE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries`
+    UPDATE {SERPER_QUERIES_TABLE}
     SET
         status = @status,
         api_status = @api_status,
@@ -326,7 +377,7 @@ def reset_batch_to_queued(claim_id: str) -> int:
         google.cloud.exceptions.GoogleCloudError: If update fails
     """
     update_query = f"""
-    UPDATE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries`
+    UPDATE {SERPER_QUERIES_TABLE}
     SET
         status = 'queued',
         claim_id = NULL,
@@ -351,7 +402,8 @@ def batch_update_query_statuses(
 
     This is a batched version of update_query_status() that uses MERGE + UNNEST
     to update multiple queries in a single database call, dramatically improving
-    performance for batch processing.
+    performance for batch processing. All rows are sent as one ARRAY<STRUCT>
+    parameter (@updates), so the SQL text is the same for every batch size.
 
     Args:
         job_id: Job identifier (same for all updates)
@@ -370,6 +422,7 @@ def batch_update_query_statuses(
     Raises:
         google.cloud.exceptions.GoogleCloudError: If MERGE fails
         ValueError: If updates list is empty
+        KeyError: If an update is missing zip, page or status
 
     Example:
         updates = [
@@ -383,57 +436,32 @@ def batch_update_query_statuses(
     if not updates:
         raise ValueError("updates list cannot be empty")
 
-    # Build values clauses for UNNEST
-    values_clauses = []
-    for i in range(len(updates)):
-        values_clauses.append(
-            f"(@job_id, @zip_{i}, @page_{i}, @status_{i}, @api_status_{i}, "
-            f"@results_count_{i}, @credits_{i}, @error_{i})"
-        )
-
-    values_sql = ",\n            ".join(values_clauses)
-
-    # MERGE query using UNNEST pattern
-    merge_query = f"""
-    MERGE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries` AS target
-    USING (
-        SELECT * FROM UNNEST([
-            STRUCT<job_id STRING, zip STRING, page INT64, status STRING,
-                   api_status INT64, results_count INT64, credits INT64, error STRING>
-            {values_sql}
-        ])
-    ) AS source
-    ON target.job_id = source.job_id
-       AND target.zip = source.zip
-       AND target.page = source.page
-    WHEN MATCHED THEN
-        UPDATE SET
-            status = source.status,
-            api_status = source.api_status,
-            results_count = source.results_count,
-            credits = source.credits,
-            error = source.error,
-            ran_at = CURRENT_TIMESTAMP()
-    """
-
-    # Build parameters
+    # Build parameters: shared job_id + one struct per update
     parameters = [
-        bigquery.ScalarQueryParameter("job_id", "STRING", job_id)
+        bigquery.ScalarQueryParameter("job_id", "STRING", job_id),
+        bigquery.ArrayQueryParameter(
+            "updates",
+            _STATUS_UPDATE_STRUCT_TYPE,
+            [
+                bigquery.StructQueryParameter(
+                    None,
+                    *(bigquery.ScalarQueryParameter(
+                        name,
+                        type_,
+                        update[name] if name in _STATUS_UPDATE_REQUIRED_FIELDS
+                        else update.get(name),
+                    ) for name, type_ in _STATUS_UPDATE_STRUCT_FIELDS)
+                )
+                for update in updates
+            ],
+        ),
     ]
 
-    for i, update in enumerate(updates):
-        parameters.extend([
-            bigquery.ScalarQueryParameter(f"zip_{i}", "STRING", update["zip"]),
-            bigquery.ScalarQueryParameter(f"page_{i}", "INT64", update["page"]),
-            bigquery.ScalarQueryParameter(f"status_{i}", "STRING", update["status"]),
-            bigquery.ScalarQueryParameter(f"api_status_{i}", "INT64", update.get("api_status")),
-            bigquery.ScalarQueryParameter(f"results_count_{i}", "INT64", update.get("results_count")),
-            bigquery.ScalarQueryParameter(f"credits_{i}", "INT64", update.get("credits")),
-            bigquery.ScalarQueryParameter(f"error_{i}", "STRING", update.get("error")),
-        ])
-
-    with timing(f"MERGE batch update {len(updates)} query statuses"):
-        rows_updated = execute_dml(merge_query, parameters)
+    with timing(
+        f"MERGE batch update {len(updates)} query statuses",
+        label="MERGE batch update query statuses",
+    ):
+        rows_updated = execute_dml(_BATCH_UPDATE_STATUSES_SQL, parameters)
     return rows_updated
 
 
@@ -477,7 +505,7 @@ def batch_skip_remaining_pages(
 
     # MERGE query using UNNEST pattern
     merge_query = f"""
-    MERGE `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries` AS target
+    MERGE {SERPER_QUERIES_TABLE} AS target
     USING (
         SELECT * FROM UNNEST([
             STRUCT<job_id STRING, zip STRING, page INT64>
@@ -505,6 +533,9 @@ def batch_skip_remaining_pages(
             bigquery.ScalarQueryParameter(f"zip_{i}", "STRING", zip_code)
         )
 
-    with timing(f"MERGE batch skip {len(zips_to_skip)} zips (pages 2-3)"):
+    with timing(
+        f"MERGE batch skip {len(zips_to_skip)} zips (pages 2-3)",
+        label="MERGE batch skip zips (pages 2-3)",
+    ):
         rows_updated = execute_dml(merge_query, parameters)
     return rows_updated
@@ -1,11 +1,13 @@
 """Prefect tasks for the scraping pipeline."""
 
 from src.tasks.bigquery_tasks import (
+    bootstrap_job_task,
     create_job_task,
     dequeue_batch_task,
     enqueue_queries_task,
     get_job_status_task,
     get_running_jobs_task,
+    get_running_jobs_with_status_task,
     get_zips_for_state_task,
     mark_job_done_task,
     skip_remaining_pages_task,
@@ -17,6 +19,7 @@ from src.tasks.serper_tasks import fetch_serper_place_task
 
 __all__ = [
     # BigQuery tasks
+    "bootstrap_job_task",
     "create_job_task",
     "get_zips_for_state_task",
     "enqueue_queries_task",
@@ -27,6 +30,7 @@ __all__ = [
     "skip_remaining_pages_task",
     "get_job_status_task",
     "get_running_jobs_task",
+    "get_running_jobs_with_status_task",
     "mark_job_done_task",
     # Serper tasks
     "fetch_serper_place_task",
@@ -11,9 +11,11 @@ from prefect import task
 
 from src.models.schemas import JobParams
 from src.operations.job_ops import (
+    bootstrap_job,
     create_job,
     get_job_status,
     get_running_jobs,
+    get_running_jobs_with_status,
     get_zips_for_state,
     mark_job_done,
     update_job_stats,
@@ -44,6 +46,28 @@ def create_job_task(job_id: str, params: JobParams) -> dict[str, Any]:
     return create_job(job_id, params)
 
 
+@task(retries=3, retry_delay_seconds=5)
+def bootstrap_job_task(
+    job_id: str,
+    params: JobParams,
+    queries: list[dict[str, Any]]
+) -> dict[str, Any]:
+    """Create a job and enqueue its queries in one BigQuery script.
+
+    Replaces create_job_task + enqueue_queries_task at job startup. The script
+    runs in a transaction, so a failed attempt leaves no partial job behind.
+
+    Args:
+        job_id: Unique job identifier
+        params: Validated job parameters
+        queries: List of query dicts
+
+    Returns:
+        Dict with job_id, status, created_at, and queries_enqueued
+    """
+    return bootstrap_job(job_id, params, queries)
+
+
 @task(retries=3, retry_delay_seconds=5)
 def get_zips_for_state_task(state: str) -> list[str]:
     """Retrieve zip codes for a state from reference table.
@@ -203,6 +227,18 @@ def get_running_jobs_task() -> list[dict[str, Any]]:
     return get_running_jobs()
 
 
+@task(retries=3, retry_delay_seconds=5)
+def get_running_jobs_with_status_task() -> list[dict[str, Any]]:
+    """Retrieve complete status information for all running jobs in one query.
+
+    Use instead of get_running_jobs_task + get_job_status_task per job.
+
+    Returns:
+        List of job status dicts (same format as get_job_status_task)
+    """
+    return get_running_jobs_with_status()
+
+
 @task(retries=3, retry_delay_seconds=5)
 def mark_job_done_task(job_id: str) -> None:
     """Mark a job as completed.
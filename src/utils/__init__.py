@@ -1,6 +1,11 @@
 """Utility modules for configuration and database connections."""
 
-from src.utils.bigquery_client import execute_dml, execute_query, get_bigquery_client
+from src.utils.bigquery_client import (
+    execute_dml,
+    execute_query,
+    get_bigquery_client,
+    submit_dml,
+)
 from src.utils.config import settings
 
 __all__ = [
@@ -8,4 +13,5 @@ __all__ = [
     "get_bigquery_client",
     "execute_query",
     "execute_dml",
+    "submit_dml",
 ]
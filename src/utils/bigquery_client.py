@@ -5,21 +5,60 @@ with proper authentication and configuration.
 """
 
 import os
-from functools import lru_cache
-
-import google.auth
-from google.cloud import bigquery
-from google.oauth2 import service_account
+import threading
+from typing import TYPE_CHECKING, Any
 
 from src.utils.config import settings
 
+# google-cloud-bigquery and google-auth are imported inside the functions that
+# need them, so importing src.utils (config, health, CLI) stays fast and small
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from google.cloud import bigquery
+    from google.cloud.bigquery.query import _AbstractQueryParameter
+
+    # Scalar, array and struct parameters can all be bound to one job
+    QueryParameters = Sequence[_AbstractQueryParameter]
+
+_BIGQUERY_SCOPES = ["https://www.googleapis.com/auth/bigquery"]
+
+# Lazily-built process-wide client (see get_bigquery_client)
+_client: "bigquery.Client | None" = None
+_client_lock = threading.Lock()
+
+# Resolved google.auth.default() result; ADC discovery is slow, so do it once
+_adc: tuple[Any, str | None] | None = None
+
+
+def _reset_client_after_fork() -> None:
+    """Drop the parent's client in a forked child; its HTTP session must not be shared."""
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_client_after_fork)
+
 
-@lru_cache(maxsize=1)
-def get_bigquery_client() -> bigquery.Client:
+def _default_credentials() -> tuple[Any, str | None]:
+    """Internal helper: resolve Application Default Credentials once per process."""
+    global _adc
+    if _adc is None:
+        import google.auth
+
+        _adc = google.auth.default(scopes=_BIGQUERY_SCOPES)
+    return _adc
+
+
+def get_bigquery_client() -> "bigquery.Client":
     """Get a configured BigQuery client instance.
 
-    This function is cached to ensure we reuse the same client instance
-    across multiple calls, which is more efficient for connection pooling.
+    The client is built once per process and reused across calls, which is
+    more efficient for connection pooling. Concurrent first callers (e.g. tasks
+    on the ConcurrentTaskRunner) are serialized by a lock so exactly one client
+    is built; later calls skip the lock entirely.
 
     Authentication Strategy (see ADR-0002):
     1. **Preferred**: Application Default Credentials (ADC)
@@ -35,15 +74,26 @@ def get_bigquery_client() -> bigquery.Client:
         FileNotFoundError: If credentials file doesn't exist
         ValueError: If credentials are invalid or ADC setup fails
     """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def _build_client() -> "bigquery.Client":
+    """Internal helper: create a BigQuery client using the configured auth strategy."""
+    from google.cloud import bigquery
+    from google.oauth2 import service_account
+
     credentials_path = settings.google_application_credentials
 
     # Use Application Default Credentials if no explicit path provided
     # This works on GCE VMs with attached service accounts or gcloud auth application-default login
     if credentials_path is None or "application_default_credentials.json" in credentials_path:
         try:
-            credentials, project = google.auth.default(
-                scopes=["https://www.googleapis.com/auth/bigquery"]
-            )
+            credentials, project = _default_credentials()
             # Use project from settings if available, otherwise from credentials
             project = settings.bigquery_project_id or project
             client = bigquery.Client(credentials=credentials, project=project)
@@ -68,7 +118,7 @@ def get_bigquery_client() -> bigquery.Client:
     # Load credentials from service account file
     credentials = service_account.Credentials.from_service_account_file(
         credentials_path,
-        scopes=["https://www.googleapis.com/auth/bigquery"]
+        scopes=_BIGQUERY_SCOPES
     )
 
     # Create and return BigQuery client
@@ -82,13 +132,27 @@ def get_bigquery_client() -> bigquery.Client:
 
 def execute_query(
     query: str,
-    parameters: list[bigquery.ScalarQueryParameter] | None = None
-) -> bigquery.table.RowIterator:
+    parameters: "QueryParameters | None" = None,
+    use_cache: bool = True,
+    priority: str = "INTERACTIVE"
+) -> "bigquery.table.RowIterator":
     """Execute a parameterized BigQuery query.
 
+    Reads opt into BigQuery's result cache: a repeated query whose text and
+    parameters are byte-identical (values are always bound as @params, never
+    interpolated) is served from cache at no cost while the underlying tables
+    are unchanged. BigQuery invalidates cached results when a table is modified.
+
+    Uses query_and_wait, so small result sets come back inline in the query
+    response instead of needing a separate getQueryResults round-trip.
+
     Args:
         query: SQL query string
         parameters: Optional list of query parameters for parameterized queries
+        use_cache: Whether BigQuery may answer from its query result cache
+        priority: bigquery.QueryPriority value. INTERACTIVE (default) runs
+                  immediately; BATCH queues until idle slots are available, for
+                  bulk work that should not compete with latency-sensitive reads
 
     Returns:
         RowIterator: Query results iterator
@@ -96,25 +160,64 @@ def execute_query(
     Raises:
         google.cloud.exceptions.GoogleCloudError: If query execution fails
     """
+    from google.cloud import bigquery
+
     client = get_bigquery_client()
 
-    job_config = bigquery.QueryJobConfig()
+    job_config = bigquery.QueryJobConfig(use_query_cache=use_cache, priority=priority)
     if parameters:
-        job_config.query_parameters = parameters
+        job_config.query_parameters = list(parameters)
 
-    query_job = client.query(query, job_config=job_config)
-    return query_job.result()
+    return client.query_and_wait(query, job_config=job_config)
+
+
+def submit_dml(
+    query: str,
+    parameters: "QueryParameters | None" = None,
+    job_id_prefix: str | None = None,
+    priority: str = "INTERACTIVE"
+) -> "bigquery.QueryJob":
+    """Submit a DML statement or script without waiting for it to finish.
+
+    Args:
+        query: DML statement string
+        parameters: Optional list of query parameters
+        job_id_prefix: Optional prefix for the BigQuery job ID (e.g. "merge_places_"),
+                       to make jobs easy to find in INFORMATION_SCHEMA.JOBS
+        priority: bigquery.QueryPriority value (see execute_query)
+
+    Returns:
+        bigquery.QueryJob: The submitted job; call .result() to wait for it
+
+    Raises:
+        google.cloud.exceptions.GoogleCloudError: If submission fails
+    """
+    from google.cloud import bigquery
+
+    client = get_bigquery_client()
+
+    # DML results are never cacheable; skip the cache lookup. Priority is always
+    # set explicitly so writes are never queued as BATCH unless a caller asks.
+    job_config = bigquery.QueryJobConfig(use_query_cache=False, priority=priority)
+    if parameters:
+        job_config.query_parameters = list(parameters)
+
+    return client.query(query, job_config=job_config, job_id_prefix=job_id_prefix)
 
 
 def execute_dml(
     query: str,
-    parameters: list[bigquery.ScalarQueryParameter] | None = None
+    parameters: "QueryParameters | None" = None,
+    job_id_prefix: str | None = None,
+    priority: str = "INTERACTIVE"
 ) -> int:
     """Execute a DML statement (INSERT, UPDATE, DELETE, MERGE) and return rows affected.
 
     Args:
         query: DML statement string
         parameters: Optional list of query parameters
+        job_id_prefix: Optional prefix for the BigQuery job ID (see submit_dml)
+        priority: bigquery.QueryPriority value (see execute_query)
 
     Returns:
         int: Number of rows affected by the DML statement
@@ -122,14 +225,11 @@ def execute_dml(
     Raises:
         google.cloud.exceptions.GoogleCloudError: If execution fails
     """
-    client = get_bigquery_client()
+    query_job = submit_dml(query, parameters, job_id_prefix=job_id_prefix, priority=priority)
 
-    job_config = bigquery.QueryJobConfig()
-    if parameters:
-        job_config.query_parameters = parameters
-
-    query_job = client.query(query, job_config=job_config)
-    result = query_job.result()
+    # Wait for completion only; DML has no rows worth fetching
+    query_job.result(max_results=0)
 
     # For DML statements, num_dml_affected_rows contains the count
     return query_job.num_dml_affected_rows or 0
+
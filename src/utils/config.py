@@ -116,14 +116,64 @@ class Settings(BaseSettings):
         default=0.01,
         description="Cost per API credit in USD"
     )
+    bigquery_cost_per_tb_usd: float = Field(
+        default=6.25,
+        description="BigQuery on-demand price per TiB scanned, for dry-run cost previews"
+    )
+
+    # Instrumentation
+    timing_enabled: bool = Field(
+        default=True,
+        description="Measure and log timing() blocks (false = no-op, for hot loops)"
+    )
+    timing_aggregate: bool = Field(
+        default=False,
+        description="Buffer timing() samples and log periodic summaries instead of one line each"
+    )
+
+    # Health Checks
+    healthcheck_deep: bool = Field(
+        default=False,
+        description="Run a live BigQuery query in health checks (shallow checks only verify config)"
+    )
+    health_probe_ttl_seconds: float = Field(
+        default=10.0,
+        description="Reuse a healthy deep BigQuery probe result for this many seconds"
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
-        extra="ignore"
+        extra="ignore",
+        frozen=True  # Loaded once at startup; catch accidental runtime mutation
     )
 
 
+def _validate_settings(config: Settings) -> tuple[str, ...]:
+    """Internal helper: list missing required configuration, if any."""
+    issues = []
+
+    if not config.google_application_credentials:
+        issues.append("GOOGLE_APPLICATION_CREDENTIALS not set")
+
+    if not config.bigquery_project_id:
+        issues.append("BIGQUERY_PROJECT_ID not set")
+
+    if not config.use_mock_api and not config.serper_api_key:
+        issues.append("SERPER_API_KEY not set (required when use_mock_api=False)")
+
+    return tuple(issues)
+
+
 # Global settings instance - loaded once at import time
 settings = Settings()
+
+# Settings are frozen, so configuration issues are computed once
+CONFIG_ISSUES = _validate_settings(settings)
+
+# Fully-qualified, backtick-quoted table references for SQL, built once from settings
+SERPER_JOBS_TABLE = f"`{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_jobs`"
+SERPER_QUERIES_TABLE = f"`{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_queries`"
+SERPER_PLACES_TABLE = f"`{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_places`"
+GEO_ZIP_TABLE = f"`{settings.bigquery_project_id}.reference.geo_zip_all`"
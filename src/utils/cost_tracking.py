@@ -3,59 +3,81 @@
 Provides functions to track API credit usage, calculate costs, and enforce budget limits.
 """
 
+import time
+from collections.abc import Callable, Mapping
 from datetime import UTC, datetime, timedelta
-from typing import Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
 
-from google.cloud import bigquery
+from src.utils.bigquery_client import execute_query, get_bigquery_client
+from src.utils.config import SERPER_JOBS_TABLE, settings
 
-from src.utils.bigquery_client import execute_query
-from src.utils.config import settings
+if TYPE_CHECKING:
+    from google.cloud import bigquery
 
+# Budget usage moves slowly relative to job submissions; reuse it for this long
+BUDGET_CACHE_TTL_SECONDS = 30
 
-def get_daily_credit_usage(date: datetime | None = None) -> dict[str, Any]:
-    """Get credit usage for a specific date.
-
-    Args:
-        date: Date to check (defaults to today UTC)
-
-    Returns:
-        Dict with total_credits, total_cost_usd, job_count
-    """
-    if date is None:
-        date = datetime.now(UTC)
-
-    # Set to start of day UTC
-    start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-    end_of_day = start_of_day + timedelta(days=1)
-
-    query = f"""
+# Per-day usage query; table names come from settings, so build the text once.
+# serper_jobs is partitioned by DATE(created_at) (sql/migrations/003), and the
+# bare created_at range below prunes the scan to just the requested days; keep
+# created_at unwrapped there or BigQuery falls back to a full scan.
+_USAGE_BATCH_SQL = f"""
     SELECT
+        DATE(created_at) as usage_date,
         COALESCE(SUM(totals.credits), 0) as total_credits,
         COUNT(*) as job_count
-    FROM `{settings.bigquery_project_id}.{settings.bigquery_dataset}.serper_jobs`
+    FROM {SERPER_JOBS_TABLE}
     WHERE created_at >= @start_date
       AND created_at < @end_date
+      AND DATE(created_at) IN UNNEST(@dates)
+    GROUP BY usage_date
     """
 
-    params = [
-        bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_of_day),
-        bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_of_day)
-    ]
+# In-process TTL cache: key -> (monotonic expiry time, value)
+_cache: dict[str, tuple[float, dict[str, Any]]] = {}
 
-    results = execute_query(query, params)
-    row = next(iter(results), None)
 
-    if row:
-        total_credits = row.total_credits
-        job_count = row.job_count
-    else:
-        total_credits = 0
-        job_count = 0
+def _cached(key: str, ttl: float, fn: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+    """Internal helper: return the cached value for key, recomputing it once expired.
+
+    Uses time.monotonic() so wall-clock jumps cannot extend or cut short an entry.
+    Callers get a shallow copy, so mutating a result cannot leak into the cache.
+    """
+    now = time.monotonic()
+    entry = _cache.get(key)
+    if entry is not None and entry[0] > now:
+        return dict(entry[1])
+
+    value = fn()
+    _cache[key] = (now + ttl, value)
+    return dict(value)
+
+
+def invalidate_budget_cache() -> None:
+    """Drop cached daily usage so the next budget check re-reads it from BigQuery.
+
+    Call after recording credits when the next budget check must see them.
+    """
+    _cache.clear()
+
+
+def _start_of_day(date: datetime) -> datetime:
+    """Internal helper: truncate a datetime to midnight (keeps tzinfo)."""
+    return date.replace(hour=0, minute=0, second=0, microsecond=0)
+
 
+def _usage_dict(day: datetime, total_credits: int, job_count: int) -> dict[str, Any]:
+    """Internal helper: build the per-day usage dict returned by usage lookups.
+
+    Day keys use date().isoformat() ("YYYY-MM-DD"), several times cheaper than
+    strftime, which re-parses its format string on every call.
+    """
     total_cost_usd = total_credits * settings.cost_per_credit
 
     return {
-        "date": start_of_day.strftime("%Y-%m-%d"),
+        "date": day.date().isoformat(),
         "total_credits": int(total_credits),
         "total_cost_usd": round(total_cost_usd, 2),
         "job_count": job_count,
@@ -63,13 +85,106 @@ def get_daily_credit_usage(date: datetime | None = None) -> dict[str, Any]:
     }
 
 
-def check_budget_status() -> dict[str, Any]:
+def get_usage_batch(dates: list[datetime]) -> dict[str, dict[str, Any]]:
+    """Get credit usage for several dates with a single BigQuery query.
+
+    Args:
+        dates: Dates to check (time of day is ignored; UTC day boundaries)
+
+    Returns:
+        Dict keyed by "YYYY-MM-DD", each value shaped like get_daily_credit_usage().
+        Dates with no jobs are included with zero usage.
+    """
+    if not dates:
+        return {}
+
+    # Deferred so importing cost_tracking does not load google-cloud-bigquery
+    from google.cloud import bigquery
+
+    # Snap to whole days: every call for the same dates binds byte-identical
+    # parameters, so repeats are answered from BigQuery's result cache until
+    # serper_jobs changes (execute_query reads with use_cache=True)
+    days = sorted({_start_of_day(date) for date in dates})
+
+    params = [
+        bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", days[0]),
+        bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", days[-1] + timedelta(days=1)),
+        bigquery.ArrayQueryParameter("dates", "DATE", [day.date() for day in days])
+    ]
+
+    results = execute_query(_USAGE_BATCH_SQL, params)
+    rows_by_date = {row.usage_date.isoformat(): row for row in results}
+
+    usage = {}
+    for day in days:
+        key = day.date().isoformat()
+        row = rows_by_date.get(key)
+        if row:
+            usage[key] = _usage_dict(day, row.total_credits, row.job_count)
+        else:
+            usage[key] = _usage_dict(day, 0, 0)
+
+    return usage
+
+
+def get_usage_range(start: datetime, end: datetime) -> dict[str, dict[str, Any]]:
+    """Get per-day credit usage for every day from start to end (inclusive).
+
+    One BigQuery query for the whole range (e.g. a 30-day dashboard), instead
+    of one get_daily_credit_usage() call per day.
+
+    Args:
+        start: First day of the range (time of day is ignored)
+        end: Last day of the range (time of day is ignored)
+
+    Returns:
+        Dict keyed by "YYYY-MM-DD" in date order (see get_usage_batch)
+    """
+    first_day = _start_of_day(start)
+    num_days = (_start_of_day(end) - first_day).days + 1
+
+    return get_usage_batch([first_day + timedelta(days=i) for i in range(num_days)])
+
+
+def get_daily_credit_usage(date: datetime | None = None) -> dict[str, Any]:
+    """Get credit usage for a specific date.
+
+    Thin wrapper over get_usage_batch() for a single day. Results are cached per
+    UTC date for BUDGET_CACHE_TTL_SECONDS, so bursts of budget checks and job
+    validations share one BigQuery read (see invalidate_budget_cache).
+
+    Args:
+        date: Date to check (defaults to today UTC)
+
+    Returns:
+        Dict with total_credits, total_cost_usd, job_count
+    """
+    if date is None:
+        date = datetime.now(UTC)
+
+    day_key = date.date().isoformat()
+    return _cached(
+        f"usage:{day_key}",
+        BUDGET_CACHE_TTL_SECONDS,
+        lambda: get_usage_batch([date])[day_key]
+    )
+
+
+def check_budget_status(usage: dict[str, Any] | None = None) -> dict[str, Any]:
     """Check current budget status for today.
 
+    Without pre-fetched usage, today's usage comes from get_daily_credit_usage's
+    short-lived cache, so bursts of job validations share one BigQuery read.
+
+    Args:
+        usage: Pre-fetched usage dict for today (from get_daily_credit_usage or
+               get_usage_batch). Fetched from BigQuery when not provided.
+
     Returns:
         Dict with budget status, usage, and whether new jobs should be blocked
     """
-    usage = get_daily_credit_usage()
+    if usage is None:
+        usage = get_daily_credit_usage()
 
     # Calculate percentage of budget used
     budget_used_pct = 0
@@ -100,37 +215,90 @@ def check_budget_status() -> dict[str, Any]:
     }
 
 
-def estimate_job_cost(num_queries: int) -> dict[str, Any]:
-    """Estimate the cost of a job based on number of queries.
-
-    Args:
-        num_queries: Number of queries the job will execute
+@lru_cache(maxsize=1024)
+def _estimate_credit_cost(num_queries: int) -> Mapping[str, Any]:
+    """Internal helper: credit-based estimate, cached per num_queries.
 
-    Returns:
-        Dict with estimated credits and cost
+    Pure arithmetic on settings, so the read-only result is shared by every caller.
     """
     # Each query consumes 1 credit
     estimated_credits = num_queries
     estimated_cost_usd = estimated_credits * settings.cost_per_credit
 
-    return {
+    return MappingProxyType({
         "num_queries": num_queries,
         "estimated_credits": estimated_credits,
         "estimated_cost_usd": round(estimated_cost_usd, 2),
         "cost_per_credit": settings.cost_per_credit
+    })
+
+
+def estimate_job_cost(
+    num_queries: int,
+    *,
+    dry_run_sql: str | None = None,
+    client: "bigquery.Client | None" = None
+) -> dict[str, Any]:
+    """Estimate the cost of a job based on number of queries.
+
+    The credit estimate is cached per num_queries. Pass dry_run_sql to also
+    preview what a BigQuery statement would scan: BigQuery validates and plans
+    it without running it (dry runs are free), and the bytes it would process
+    are priced at settings.bigquery_cost_per_tb_usd. Dry-run previews are not
+    cached, since table sizes change.
+
+    Args:
+        num_queries: Number of queries the job will execute
+        dry_run_sql: Optional SQL to dry-run for a bytes-processed preview
+        client: BigQuery client for the dry run (defaults to get_bigquery_client())
+
+    Returns:
+        Dict with estimated credits and cost, plus
+        estimated_bytes_processed and estimated_bq_cost_usd when dry_run_sql is given
+
+    Raises:
+        google.cloud.exceptions.GoogleCloudError: If the dry run fails (e.g. invalid SQL)
+    """
+    # Copy the cached read-only estimate so callers get a plain, mutable,
+    # JSON-serializable dict
+    estimate = _estimate_credit_cost(num_queries)
+    if dry_run_sql is None:
+        return dict(estimate)
+
+    # Deferred so importing cost_tracking does not load google-cloud-bigquery
+    from google.cloud import bigquery
+
+    if client is None:
+        client = get_bigquery_client()
+
+    job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+    job = client.query(dry_run_sql, job_config=job_config)
+    bytes_processed = job.total_bytes_processed or 0
+
+    return {
+        **estimate,
+        "estimated_bytes_processed": bytes_processed,
+        "estimated_bq_cost_usd": round(
+            bytes_processed / 2**40 * settings.bigquery_cost_per_tb_usd, 6
+        )
     }
 
 
-def validate_budget_for_job(num_queries: int) -> dict[str, Any]:
+def validate_budget_for_job(
+    num_queries: int,
+    usage: dict[str, Any] | None = None
+) -> dict[str, Any]:
     """Validate if a new job would exceed budget limits.
 
     Args:
         num_queries: Number of queries the job will execute
+        usage: Pre-fetched usage dict for today; pass the same dict when
+               validating several jobs so only one BigQuery query runs
 
     Returns:
         Dict with validation result and details
     """
-    budget_status = check_budget_status()
+    budget_status = check_budget_status(usage)
     job_estimate = estimate_job_cost(num_queries)
 
     # Check if budget is already exceeded
@@ -168,3 +336,35 @@ def validate_budget_for_job(num_queries: int) -> dict[str, Any]:
         "budget_status": budget_status,
         "job_estimate": job_estimate
     }
+
+
+def validate_budgets_for_jobs(num_queries_list: list[int]) -> list[dict[str, Any]]:
+    """Validate several prospective jobs against today's budget with one usage read.
+
+    Jobs are admitted in order: each allowed job's estimated cost counts toward
+    the usage seen by the jobs after it, so the batch as a whole cannot
+    overshoot the budget even though every job fits on its own.
+
+    Args:
+        num_queries_list: Number of queries for each job, in admission order
+
+    Returns:
+        One validate_budget_for_job() result per job, in the same order
+    """
+    usage = get_daily_credit_usage()
+    results = []
+
+    for num_queries in num_queries_list:
+        result = validate_budget_for_job(num_queries, usage)
+        if result["allowed"]:
+            job_estimate = result["job_estimate"]
+            usage = {
+                **usage,
+                "total_credits": usage["total_credits"] + job_estimate["estimated_credits"],
+                "total_cost_usd": round(
+                    usage["total_cost_usd"] + job_estimate["estimated_cost_usd"], 2
+                )
+            }
+        results.append(result)
+
+    return results
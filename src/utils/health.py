@@ -3,43 +3,84 @@
 Provides functions to check the health of various system components.
 """
 
+import time
 from typing import Any
 
 from src.utils.bigquery_client import get_bigquery_client
-from src.utils.config import settings
+from src.utils.config import CONFIG_ISSUES, settings
 
+# Last healthy deep probe: (time.monotonic() when taken, result dict)
+_LAST_PROBE: tuple[float, dict[str, Any]] | None = None
 
-def check_bigquery_connection() -> dict[str, Any]:
+
+def check_bigquery_connection(deep: bool | None = None) -> dict[str, Any]:
     """Check if BigQuery connection is working.
 
+    A shallow check only verifies the BigQuery settings are present, without
+    building a client (no credential discovery or network round-trip). A deep
+    check fetches the dataset's metadata; a healthy result is reused for
+    settings.health_probe_ttl_seconds so frequent probes don't each cost a
+    round-trip. Failures are never cached, so the next call re-probes.
+
+    Args:
+        deep: Probe BigQuery itself (defaults to settings.healthcheck_deep / HEALTHCHECK_DEEP)
+
     Returns:
         Dict with status, message, and optional error details
     """
+    if deep is None:
+        deep = settings.healthcheck_deep
+
+    if not deep:
+        if not settings.bigquery_project_id or not settings.bigquery_dataset:
+            return {
+                "status": "unhealthy",
+                "message": "BigQuery project or dataset not configured"
+            }
+        return {
+            "status": "healthy",
+            "message": "BigQuery configured (shallow check; set HEALTHCHECK_DEEP=1 to probe)",
+            "project_id": settings.bigquery_project_id,
+            "dataset": settings.bigquery_dataset
+        }
+
+    global _LAST_PROBE
+    if _LAST_PROBE is not None:
+        probed_at, cached_result = _LAST_PROBE
+        if time.monotonic() - probed_at < settings.health_probe_ttl_seconds:
+            # Copy so a caller adding keys can't alter the cached probe
+            return dict(cached_result)
+
+    from google.api_core.exceptions import NotFound
+
+    dataset_ref = f"{settings.bigquery_project_id}.{settings.bigquery_dataset}"
+
     try:
         client = get_bigquery_client()
 
-        # Simple query to test connection
-        query = """
-        SELECT 1 as health_check
-        """
+        # Dataset metadata GET: proves auth and connectivity without creating
+        # a query job (no job scheduling latency, nothing billed)
+        client.get_dataset(dataset_ref)
 
-        query_job = client.query(query)
-        result = list(query_job.result())
+        result = {
+            "status": "healthy",
+            "message": "BigQuery connection successful",
+            "project_id": settings.bigquery_project_id,
+            "dataset": settings.bigquery_dataset
+        }
+        _LAST_PROBE = (time.monotonic(), result)
+        return dict(result)
 
-        if result and result[0].health_check == 1:
-            return {
-                "status": "healthy",
-                "message": "BigQuery connection successful",
-                "project_id": settings.bigquery_project_id,
-                "dataset": settings.bigquery_dataset
-            }
-        else:
-            return {
-                "status": "unhealthy",
-                "message": "BigQuery query returned unexpected result"
-            }
+    except NotFound as e:
+        _LAST_PROBE = None
+        return {
+            "status": "unhealthy",
+            "message": f"BigQuery dataset not found: {dataset_ref}",
+            "error": str(e)
+        }
 
     except Exception as e:
+        _LAST_PROBE = None
         return {
             "status": "unhealthy",
             "message": f"BigQuery connection failed: {type(e).__name__}",
@@ -50,26 +91,17 @@ def check_bigquery_connection() -> dict[str, Any]:
 def check_configuration() -> dict[str, Any]:
     """Check if required configuration is present.
 
+    Settings are frozen at startup, so the issue list is computed once at
+    import (see src.utils.config.CONFIG_ISSUES).
+
     Returns:
         Dict with status and configuration details
     """
-    issues = []
-
-    # Check required settings
-    if not settings.google_application_credentials:
-        issues.append("GOOGLE_APPLICATION_CREDENTIALS not set")
-
-    if not settings.bigquery_project_id:
-        issues.append("BIGQUERY_PROJECT_ID not set")
-
-    if not settings.use_mock_api and not settings.serper_api_key:
-        issues.append("SERPER_API_KEY not set (required when use_mock_api=False)")
-
-    if issues:
+    if CONFIG_ISSUES:
         return {
             "status": "unhealthy",
             "message": "Configuration issues detected",
-            "issues": issues
+            "issues": list(CONFIG_ISSUES)
         }
     else:
         return {
@@ -80,14 +112,26 @@ def check_configuration() -> dict[str, Any]:
         }
 
 
-def get_system_health() -> dict[str, Any]:
+def get_system_health(deep: bool | None = None) -> dict[str, Any]:
     """Get overall system health status.
 
+    If configuration is unhealthy the BigQuery check is skipped: it cannot
+    succeed meaningfully, and probing would only add a round-trip.
+
+    Args:
+        deep: Probe BigQuery as part of the check (see check_bigquery_connection)
+
     Returns:
         Dict with overall status and component health checks
     """
     config_health = check_configuration()
-    bigquery_health = check_bigquery_connection()
+    if config_health["status"] != "healthy":
+        bigquery_health = {
+            "status": "skipped",
+            "message": "Skipped: configuration is unhealthy"
+        }
+    else:
+        bigquery_health = check_bigquery_connection(deep)
 
     # System is healthy only if all components are healthy
     overall_healthy = (
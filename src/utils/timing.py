@@ -4,13 +4,23 @@ Provides a context manager for timing operations and logging results.
 """
 
 import time
-from contextlib import contextmanager
+from collections import deque
+from contextlib import AbstractContextManager, contextmanager, nullcontext
 
 from prefect import get_run_logger
 
+from src.utils.config import settings
 
-@contextmanager
-def timing(operation: str, log_threshold_ms: float | None = None):
+# (label, elapsed_ns) samples buffered when TIMING_AGGREGATE=true; drained by
+# flush_timing_summary(). deque.append is thread-safe, and maxlen bounds memory.
+_TIMING_BUF: deque[tuple[str, int]] = deque(maxlen=8192)
+
+
+def timing(
+    operation: str,
+    log_threshold_ms: float | None = None,
+    label: str | None = None
+) -> AbstractContextManager[dict[str, float]]:
     """Context manager for timing operations.
 
     Usage:
@@ -21,30 +31,99 @@ def timing(operation: str, log_threshold_ms: float | None = None):
         with timing("Fast operation", log_threshold_ms=100):
             quick_task()
 
+        # Per-call detail in the log line, one stable bucket for summaries
+        with timing(f"MERGE store {n} places", label="MERGE store places"):
+            ...
+
     Args:
         operation: Human-readable description of the operation
         log_threshold_ms: Only log if operation takes longer than this (ms)
-                         If None, always log
+                         If None, always log. With TIMING_AGGREGATE=true every
+                         sample is still aggregated; calls over the threshold
+                         are additionally logged on their own (None = never)
+        label: Stable key samples are aggregated under with TIMING_AGGREGATE=true.
+               Defaults to operation; pass one whenever operation embeds
+               per-call values (counts, ids), or every sample gets its own bucket
 
     Yields:
-        Dict with elapsed_ms key (updated after context exits)
+        Dict with elapsed_ms and elapsed_ns keys (updated after context exits).
+        With TIMING_ENABLED=false nothing is measured and both stay 0.
     """
-    logger = get_run_logger()
-    start_time = time.time()
-    timing_data = {"elapsed_ms": 0}
+    if not settings.timing_enabled:
+        # Fresh dict per call, so one caller writing to it can't affect another
+        return nullcontext({"elapsed_ms": 0.0, "elapsed_ns": 0})
+    return _timing(operation, log_threshold_ms, label or operation)
+
+
+@contextmanager
+def _timing(operation: str, log_threshold_ms: float | None, label: str):
+    """Internal helper: the measuring implementation behind timing()."""
+    # Monotonic, integer nanoseconds: immune to wall-clock jumps
+    start_ns = time.perf_counter_ns()
+    timing_data: dict[str, float] = {"elapsed_ms": 0.0, "elapsed_ns": 0}
 
     try:
         yield timing_data
     finally:
-        elapsed_seconds = time.time() - start_time
-        elapsed_ms = elapsed_seconds * 1000
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        elapsed_ms = elapsed_ns / 1_000_000
+        timing_data["elapsed_ns"] = elapsed_ns
         timing_data["elapsed_ms"] = elapsed_ms
 
-        # Decide whether to log based on threshold
-        should_log = (log_threshold_ms is None) or (elapsed_ms >= log_threshold_ms)
+        if settings.timing_aggregate:
+            # Record a sample instead of a log line; a threshold still surfaces
+            # individual slow calls
+            _TIMING_BUF.append((label, elapsed_ns))
+            should_log = log_threshold_ms is not None and elapsed_ms >= log_threshold_ms
+        else:
+            should_log = (log_threshold_ms is None) or (elapsed_ms >= log_threshold_ms)
 
         if should_log:
+            # Only look up the run logger when there is something to log
+            logger = get_run_logger()
             if elapsed_ms < 1000:
                 logger.info(f"⏱️  {operation}: {elapsed_ms:.1f}ms")
             else:
-                logger.info(f"⏱️  {operation}: {elapsed_seconds:.2f}s")
+                logger.info(f"⏱️  {operation}: {elapsed_ns / 1_000_000_000:.2f}s")
+
+
+def flush_timing_summary() -> dict[str, dict[str, float]]:
+    """Drain buffered timing samples and log one summary line per label.
+
+    Only collects anything when TIMING_AGGREGATE=true. Call periodically from
+    long-running loops and once at shutdown.
+
+    Returns:
+        Dict keyed by label with count, min_ms, max_ms, p50_ms, p99_ms
+    """
+    samples: dict[str, list[int]] = {}
+    while _TIMING_BUF:
+        try:
+            label, elapsed_ns = _TIMING_BUF.popleft()
+        except IndexError:  # Drained concurrently by another thread
+            break
+        samples.setdefault(label, []).append(elapsed_ns)
+
+    if not samples:
+        return {}
+
+    logger = get_run_logger()
+    summary = {}
+    for label, values in samples.items():
+        values.sort()
+        last = len(values) - 1
+        stats = {
+            "count": len(values),
+            "min_ms": values[0] / 1_000_000,
+            "max_ms": values[last] / 1_000_000,
+            "p50_ms": values[last // 2] / 1_000_000,
+            "p99_ms": values[int(last * 0.99)] / 1_000_000,
+        }
+        summary[label] = stats
+        logger.info(
+            f"⏱️  {label}: n={stats['count']} "
+            f"p50={stats['p50_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms "
+            f"min={stats['min_ms']:.1f}ms max={stats['max_ms']:.1f}ms"
+        )
+
+    return summary
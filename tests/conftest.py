@@ -4,7 +4,8 @@ This file is automatically loaded by pytest and provides fixtures
 that can be used across all test files.
 """
 
-from datetime import datetime
+from datetime import UTC, datetime
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -25,6 +26,42 @@ def mock_env_vars(monkeypatch):
     monkeypatch.setenv("SERPER_API_KEY", "")  # Not needed for mock
 
 
+@pytest.fixture(autouse=True)
+def clear_zips_cache():
+    """Clear the per-process get_zips_for_state cache between tests."""
+    from src.operations.job_ops import clear_zips_for_state_cache
+
+    clear_zips_for_state_cache()
+    yield
+    clear_zips_for_state_cache()
+
+
+@pytest.fixture(autouse=True)
+def clear_mark_done_cache():
+    """Clear the per-process recently-marked-done job cache between tests."""
+    from src.operations.job_ops import clear_mark_job_done_cache
+
+    clear_mark_job_done_cache()
+    yield
+    clear_mark_job_done_cache()
+
+
+@pytest.fixture(autouse=True)
+def clear_health_probe_cache(monkeypatch):
+    """Forget the cached BigQuery health probe between tests."""
+    monkeypatch.setattr("src.utils.health._LAST_PROBE", None)
+
+
+@pytest.fixture(autouse=True)
+def clear_budget_cache():
+    """Clear the in-process budget status cache between tests."""
+    from src.utils.cost_tracking import invalidate_budget_cache
+
+    invalidate_budget_cache()
+    yield
+    invalidate_budget_cache()
+
+
 @pytest.fixture
 def mock_bigquery_client():
     """Mock BigQuery client for testing database operations."""
@@ -110,20 +147,37 @@ def sample_places():
 
 @pytest.fixture
 def sample_bigquery_row():
-    """Create a mock BigQuery row object."""
-    class MockRow:
-        def __init__(self, **kwargs):
-            for key, value in kwargs.items():
-                setattr(self, key, value)
+    """Create a mock BigQuery row object.
+
+    Rows are plain attribute bags: sample_bigquery_row(zip="85001", page=1).
+    """
+    return SimpleNamespace
+
+
+@pytest.fixture
+def usage_scenario(mock_execute_query, sample_bigquery_row):
+    """Set the daily credit usage BigQuery returns (defaults to today UTC).
+
+    Usage:
+        usage_scenario(2000, 10)  # $20 spent across 10 jobs today
+    """
+    def _set(total_credits, job_count, usage_date=None):
+        mock_execute_query.return_value = [
+            sample_bigquery_row(
+                usage_date=usage_date or datetime.now(UTC).date(),
+                total_credits=total_credits,
+                job_count=job_count,
+            )
+        ]
 
-    return MockRow
+    return _set
 
 
 @pytest.fixture
-def mock_datetime_utcnow():
-    """Mock datetime.utcnow for consistent timestamps in tests."""
-    fixed_time = datetime(2025, 1, 1, 12, 0, 0)
+def mock_datetime_now():
+    """Mock datetime.now(UTC) for consistent timestamps in tests."""
+    fixed_time = datetime(2025, 1, 1, 12, 0, 0, tzinfo=UTC)
     with patch("src.utils.cost_tracking.datetime") as mock_dt:
-        mock_dt.utcnow.return_value = fixed_time
+        mock_dt.now.return_value = fixed_time
         mock_dt.side_effect = lambda *args, **kw: datetime(*args, **kw)
         yield fixed_time
@@ -0,0 +1,12 @@
+"""Shared SQL and query-parameter helpers for the test suite."""
+
+
+def assert_contains_all(sql, fragments):
+    """Assert that every fragment appears in the SQL, reporting all that are missing."""
+    missing = [fragment for fragment in fragments if fragment not in sql]
+    assert not missing, f"SQL is missing {missing}"
+
+
+def params_by_name(parameters):
+    """Map a list of query parameters by name."""
+    return {p.name: p for p in parameters}
@@ -4,7 +4,7 @@ import pytest
 from pydantic import ValidationError
 
 from src.models.schemas import JobParams
-from src.utils.config import settings
+from src.utils.config import Settings, _validate_settings, settings
 
 
 class TestSettings:
@@ -37,6 +37,27 @@ class TestSettings:
         assert settings.serper_retries == 3
         assert settings.serper_retry_delay_seconds == 5
 
+    def test_settings_are_frozen(self):
+        """Test that the global settings instance cannot be mutated at runtime."""
+        with pytest.raises(ValidationError):
+            settings.daily_budget_usd = 1.0
+
+    def test_validate_settings_reports_missing_values(self):
+        """Test that configuration issues are derived from a Settings instance."""
+        config = Settings(
+            google_application_credentials=None,
+            bigquery_project_id="",
+            use_mock_api=False,
+            serper_api_key="",
+        )
+
+        issues = _validate_settings(config)
+
+        assert len(issues) == 3
+        assert any("CREDENTIALS" in issue for issue in issues)
+        assert any("PROJECT_ID" in issue for issue in issues)
+        assert any("API_KEY" in issue for issue in issues)
+
 
 class TestJobParams:
     """Test JobParams validation."""
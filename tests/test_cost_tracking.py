@@ -1,23 +1,30 @@
 """Tests for cost tracking and budget management."""
 
-from datetime import datetime
+import json
+from datetime import date, datetime
+from unittest.mock import Mock
+
+from google.cloud import bigquery
 
 from src.utils.cost_tracking import (
     check_budget_status,
     estimate_job_cost,
     get_daily_credit_usage,
+    get_usage_batch,
+    get_usage_range,
+    invalidate_budget_cache,
     validate_budget_for_job,
+    validate_budgets_for_jobs,
 )
 
 
 class TestGetDailyCreditUsage:
     """Test daily credit usage calculation."""
 
-    def test_with_usage(self, mock_execute_query, sample_bigquery_row, mock_datetime_utcnow):
+    def test_with_usage(self, usage_scenario, mock_datetime_now):
         """Test credit usage when there are jobs."""
         # Mock BigQuery response
-        mock_row = sample_bigquery_row(total_credits=500, job_count=5)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(500, 5, usage_date=date(2025, 1, 1))
 
         result = get_daily_credit_usage()
 
@@ -27,10 +34,9 @@ class TestGetDailyCreditUsage:
         assert result["date"] == "2025-01-01"
         assert result["daily_budget_usd"] == 100.0
 
-    def test_with_no_usage(self, mock_execute_query, sample_bigquery_row):
+    def test_with_no_usage(self, mock_execute_query):
         """Test credit usage when there are no jobs."""
-        mock_row = sample_bigquery_row(total_credits=0, job_count=0)
-        mock_execute_query.return_value = [mock_row]
+        mock_execute_query.return_value = []
 
         result = get_daily_credit_usage()
 
@@ -38,10 +44,20 @@ class TestGetDailyCreditUsage:
         assert result["total_cost_usd"] == 0.0
         assert result["job_count"] == 0
 
-    def test_with_custom_date(self, mock_execute_query, sample_bigquery_row):
+    def test_usage_cached_per_date(self, mock_execute_query, usage_scenario):
+        """Test that repeated lookups for the same day reuse one BigQuery read."""
+        usage_scenario(100, 1, usage_date=date(2025, 6, 15))
+
+        first = get_daily_credit_usage(datetime(2025, 6, 15, 9, 0, 0))
+        first["total_credits"] = -1  # Mutating a result must not leak into the cache
+        second = get_daily_credit_usage(datetime(2025, 6, 15, 17, 0, 0))
+
+        assert mock_execute_query.call_count == 1
+        assert second["total_credits"] == 100
+
+    def test_with_custom_date(self, usage_scenario):
         """Test credit usage for a specific date."""
-        mock_row = sample_bigquery_row(total_credits=100, job_count=1)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(100, 1, usage_date=date(2025, 6, 15))
 
         custom_date = datetime(2025, 6, 15, 14, 30, 0)
         result = get_daily_credit_usage(date=custom_date)
@@ -50,6 +66,92 @@ class TestGetDailyCreditUsage:
         assert result["total_credits"] == 100
 
 
+class TestGetUsageBatch:
+    """Test multi-date credit usage lookup."""
+
+    def test_single_query_for_many_dates(self, mock_execute_query, sample_bigquery_row):
+        """Test that several dates are fetched with one query and missing days are zero."""
+        mock_execute_query.return_value = [
+            sample_bigquery_row(usage_date=date(2025, 6, 14), total_credits=300, job_count=3),
+            sample_bigquery_row(usage_date=date(2025, 6, 16), total_credits=50, job_count=1),
+        ]
+
+        result = get_usage_batch([
+            datetime(2025, 6, 16, 9, 0, 0),
+            datetime(2025, 6, 14, 23, 59, 0),
+            datetime(2025, 6, 15, 0, 0, 0),
+        ])
+
+        assert mock_execute_query.call_count == 1
+        query, params = mock_execute_query.call_args[0]
+        assert "GROUP BY usage_date" in query
+        assert "UNNEST(@dates)" in query
+
+        dates_param = next(p for p in params if p.name == "dates")
+        assert isinstance(dates_param, bigquery.ArrayQueryParameter)
+        assert dates_param.values == [date(2025, 6, 14), date(2025, 6, 15), date(2025, 6, 16)]
+
+        assert list(result) == ["2025-06-14", "2025-06-15", "2025-06-16"]
+        assert result["2025-06-14"]["total_credits"] == 300
+        assert result["2025-06-14"]["total_cost_usd"] == 3.0
+        assert result["2025-06-15"]["total_credits"] == 0
+        assert result["2025-06-15"]["job_count"] == 0
+        assert result["2025-06-16"]["job_count"] == 1
+
+    def test_params_snapped_to_day_for_result_cache(self, mock_execute_query):
+        """Test that calls at different times of day bind identical parameters."""
+        mock_execute_query.return_value = []
+
+        get_usage_batch([datetime(2025, 6, 15, 8, 1, 2, 345)])
+        get_usage_batch([datetime(2025, 6, 15, 17, 59, 59, 999999)])
+
+        first, second = (call[0] for call in mock_execute_query.call_args_list)
+        assert first[0] == second[0]
+        assert [p.to_api_repr() for p in first[1]] == [p.to_api_repr() for p in second[1]]
+
+    def test_daily_query_uses_partition_pruning(self, mock_execute_query):
+        """Test that the query bounds the partitioning column with bare parameters."""
+        mock_execute_query.return_value = []
+
+        get_usage_batch([datetime(2025, 6, 15)])
+
+        query, params = mock_execute_query.call_args[0]
+        assert "created_at >= @start_date" in query
+        assert "created_at < @end_date" in query
+        bounds = {p.name: p.value for p in params if p.name in ("start_date", "end_date")}
+        assert bounds == {
+            "start_date": datetime(2025, 6, 15),
+            "end_date": datetime(2025, 6, 16),
+        }
+
+    def test_empty_dates(self, mock_execute_query):
+        """Test that no query runs for an empty date list."""
+        assert get_usage_batch([]) == {}
+        mock_execute_query.assert_not_called()
+
+
+class TestGetUsageRange:
+    """Test rolling-window credit usage lookup."""
+
+    def test_range_is_one_query_covering_every_day(self, mock_execute_query, sample_bigquery_row):
+        """Test that a multi-day range is fetched in one query with one entry per day."""
+        mock_execute_query.return_value = [
+            sample_bigquery_row(usage_date=date(2025, 6, 2), total_credits=200, job_count=2),
+        ]
+
+        result = get_usage_range(datetime(2025, 6, 1, 18, 0), datetime(2025, 6, 7, 6, 0))
+
+        assert mock_execute_query.call_count == 1
+        assert list(result) == [f"2025-06-0{d}" for d in range(1, 8)]
+        assert result["2025-06-02"]["total_credits"] == 200
+        assert sum(day["job_count"] for day in result.values()) == 2
+
+    def test_empty_range(self, mock_execute_query):
+        """Test that an end before start returns nothing without querying."""
+        assert get_usage_range(datetime(2025, 6, 7), datetime(2025, 6, 1)) == {}
+        mock_execute_query.assert_not_called()
+
+
 class TestEstimateJobCost:
     """Test job cost estimation."""
 
@@ -78,15 +180,39 @@ class TestEstimateJobCost:
         assert result["estimated_credits"] == 0
         assert result["estimated_cost_usd"] == 0.0
 
+    def test_returned_dict_is_independent_copy(self):
+        """Test that each estimate is a plain dict callers may serialize or modify."""
+        result = estimate_job_cost(100)
+
+        assert type(result) is dict
+        assert json.loads(json.dumps(result)) == result
+
+        # Mutating one result does not leak into the cached estimate
+        result["estimated_cost_usd"] = 0
+        assert estimate_job_cost(100)["estimated_cost_usd"] == 1.0
+
+    def test_estimate_with_dry_run(self):
+        """Test that dry_run_sql adds a bytes-processed preview."""
+        client = Mock()
+        client.query.return_value = Mock(total_bytes_processed=2**40)
+
+        result = estimate_job_cost(100, dry_run_sql="SELECT 1", client=client)
+
+        assert result["estimated_cost_usd"] == 1.0
+        assert result["estimated_bytes_processed"] == 2**40
+        assert result["estimated_bq_cost_usd"] == 6.25
+        job_config = client.query.call_args.kwargs["job_config"]
+        assert job_config.dry_run is True
+        assert job_config.use_query_cache is False
+
 
 class TestCheckBudgetStatus:
     """Test budget status checking."""
 
-    def test_ok_status(self, mock_execute_query, sample_bigquery_row):
+    def test_ok_status(self, usage_scenario):
         """Test budget status when well below limits."""
         # Usage: $20 / $100 budget = 20%
-        mock_row = sample_bigquery_row(total_credits=2000, job_count=10)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(2000, 10)
 
         result = check_budget_status()
 
@@ -96,11 +222,10 @@ class TestCheckBudgetStatus:
         assert result["remaining_budget_usd"] == 80.0
         assert result["total_cost_usd"] == 20.0
 
-    def test_warning_status(self, mock_execute_query, sample_bigquery_row):
+    def test_warning_status(self, usage_scenario):
         """Test budget status when approaching limits."""
         # Usage: $85 / $100 budget = 85% (above 80% soft threshold)
-        mock_row = sample_bigquery_row(total_credits=8500, job_count=50)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(8500, 50)
 
         result = check_budget_status()
 
@@ -109,11 +234,10 @@ class TestCheckBudgetStatus:
         assert result["budget_used_pct"] == 85.0
         assert result["remaining_budget_usd"] == 15.0
 
-    def test_exceeded_status(self, mock_execute_query, sample_bigquery_row):
+    def test_exceeded_status(self, usage_scenario):
         """Test budget status when budget is exceeded."""
         # Usage: $120 / $100 budget = 120% (above 100% hard threshold)
-        mock_row = sample_bigquery_row(total_credits=12000, job_count=100)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(12000, 100)
 
         result = check_budget_status()
 
@@ -122,30 +246,45 @@ class TestCheckBudgetStatus:
         assert result["budget_used_pct"] == 120.0
         assert result["remaining_budget_usd"] == -20.0
 
+    def test_status_cached_until_invalidated(self, mock_execute_query, usage_scenario):
+        """Test that repeated checks reuse one BigQuery read until the cache is invalidated."""
+        usage_scenario(2000, 10)
+
+        first = check_budget_status()
+        second = check_budget_status()
+
+        assert mock_execute_query.call_count == 1
+        assert second == first
+
+        invalidate_budget_cache()
+        check_budget_status()
+
+        assert mock_execute_query.call_count == 2
+
 
 class TestValidateBudgetForJob:
     """Test budget validation for new jobs."""
 
-    def test_job_allowed_within_budget(self, mock_execute_query, sample_bigquery_row):
+    def test_job_allowed_within_budget(self, mock_execute_query, usage_scenario):
         """Test that job is allowed when within budget."""
         # Current usage: $20
-        mock_row = sample_bigquery_row(total_credits=2000, job_count=10)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(2000, 10)
 
         # New job: 1000 queries = $10
         # Total would be $30 / $100 = 30% (OK)
         result = validate_budget_for_job(1000)
 
+        # Usage is read once and shared by the status check and the estimate
+        assert mock_execute_query.call_count == 1
         assert result["allowed"] is True
         assert result["reason"] == "within_budget"
         assert "within budget" in result["message"].lower()
         assert result["job_estimate"]["estimated_cost_usd"] == 10.0
 
-    def test_job_would_exceed_budget(self, mock_execute_query, sample_bigquery_row):
+    def test_job_would_exceed_budget(self, usage_scenario):
         """Test that job is blocked when it would exceed budget."""
         # Current usage: $80
-        mock_row = sample_bigquery_row(total_credits=8000, job_count=50)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(8000, 50)
 
         # New job: 3000 queries = $30
         # Total would be $110 / $100 = 110% (BLOCKED)
@@ -156,13 +295,10 @@ class TestValidateBudgetForJob:
         assert "would exceed" in result["message"].lower()
         assert result["job_estimate"]["estimated_cost_usd"] == 30.0
 
-    def test_job_blocked_budget_already_exceeded(
-        self, mock_execute_query, sample_bigquery_row
-    ):
+    def test_job_blocked_budget_already_exceeded(self, usage_scenario):
         """Test that job is blocked when budget already exceeded."""
         # Current usage: $120 (already exceeded)
-        mock_row = sample_bigquery_row(total_credits=12000, job_count=100)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(12000, 100)
 
         # Any new job should be blocked
         result = validate_budget_for_job(100)
@@ -171,11 +307,10 @@ class TestValidateBudgetForJob:
         assert result["reason"] == "daily_budget_exceeded"
         assert "already exceeded" in result["message"].lower()
 
-    def test_large_job_validation(self, mock_execute_query, sample_bigquery_row):
+    def test_large_job_validation(self, usage_scenario):
         """Test budget validation for a large state like California."""
         # Current usage: $0
-        mock_row = sample_bigquery_row(total_credits=0, job_count=0)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(0, 0)
 
         # California: 1767 zips × 3 pages = 5301 queries = $53.01
         # This would exceed $50 budget
@@ -184,12 +319,35 @@ class TestValidateBudgetForJob:
         # With default $100 budget, should be allowed
         assert result["allowed"] is True
 
-    def test_zero_query_job(self, mock_execute_query, sample_bigquery_row):
+    def test_zero_query_job(self, usage_scenario):
         """Test validation for a job with zero queries."""
-        mock_row = sample_bigquery_row(total_credits=0, job_count=0)
-        mock_execute_query.return_value = [mock_row]
+        usage_scenario(0, 0)
 
         result = validate_budget_for_job(0)
 
         assert result["allowed"] is True
         assert result["job_estimate"]["estimated_cost_usd"] == 0.0
+
+    def test_prefetched_usage_skips_query(self, mock_execute_query, usage_scenario):
+        """Test that validating several jobs against pre-fetched usage runs one query."""
+        usage_scenario(8000, 50)
+
+        usage = get_daily_credit_usage()
+        results = [validate_budget_for_job(n, usage=usage) for n in (1000, 3000)]
+
+        assert mock_execute_query.call_count == 1
+        assert results[0]["allowed"] is True
+        assert results[1]["allowed"] is False
+        assert results[1]["reason"] == "would_exceed_budget"
+
+    def test_bulk_validate_shares_usage_query(self, mock_execute_query, usage_scenario):
+        """Test that bulk validation reads usage once and counts admitted jobs."""
+        # Current usage: $80; each job costs $15
+        usage_scenario(8000, 50)
+
+        results = validate_budgets_for_jobs([1500, 1500, 500])
+
+        assert mock_execute_query.call_count == 1
+        assert [r["allowed"] for r in results] == [True, False, True]
+        assert results[1]["reason"] == "would_exceed_budget"
+        assert results[2]["budget_status"]["total_cost_usd"] == 95.0
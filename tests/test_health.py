@@ -1,6 +1,9 @@
 """Tests for health check utilities."""
 
-from unittest.mock import MagicMock
+from types import SimpleNamespace
+
+import pytest
+from google.api_core.exceptions import NotFound
 
 from src.utils.health import (
     check_bigquery_connection,
@@ -9,6 +12,32 @@ from src.utils.health import (
 )
 
 
+class _FakeBigQueryClient:
+    """Minimal stand-in for bigquery.Client: returns a dataset or raises."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def get_dataset(self, dataset_ref):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        project, dataset_id = dataset_ref.split(".")
+        return SimpleNamespace(project=project, dataset_id=dataset_id)
+
+
+@pytest.fixture
+def fake_bigquery(monkeypatch):
+    """Install a _FakeBigQueryClient as the client the health checks use."""
+    def _install(error=None):
+        client = _FakeBigQueryClient(error)
+        monkeypatch.setattr("src.utils.health.get_bigquery_client", lambda: client)
+        return client
+
+    return _install
+
+
 class TestCheckConfiguration:
     """Test configuration health check."""
 
@@ -54,98 +83,122 @@ class TestCheckConfiguration:
 class TestCheckBigQueryConnection:
     """Test BigQuery connection health check."""
 
-    def test_healthy_connection(self, mock_bigquery_client):
+    def test_healthy_connection(self, fake_bigquery):
         """Test successful BigQuery connection."""
-        # Mock successful query
-        mock_result = MagicMock()
-        mock_result.health_check = 1
-        mock_bigquery_client.query.return_value.result.return_value = [mock_result]
+        fake_bigquery()
 
-        result = check_bigquery_connection()
+        result = check_bigquery_connection(deep=True)
 
         assert result["status"] == "healthy"
         assert "successful" in result["message"].lower()
         assert result["project_id"] == "test-project"
         assert result["dataset"] == "test_dataset"
 
-    def test_connection_failure(self, mock_bigquery_client):
+    def test_connection_failure(self, fake_bigquery):
         """Test BigQuery connection failure."""
-        # Mock connection error
-        mock_bigquery_client.query.side_effect = Exception("Connection refused")
+        fake_bigquery(error=Exception("Connection refused"))
 
-        result = check_bigquery_connection()
+        result = check_bigquery_connection(deep=True)
 
         assert result["status"] == "unhealthy"
         assert "failed" in result["message"].lower()
         assert "error" in result
         assert "Connection refused" in result["error"]
 
-    def test_unexpected_query_result(self, mock_bigquery_client):
-        """Test when query returns unexpected result."""
-        # Mock unexpected result
-        mock_result = MagicMock()
-        mock_result.health_check = 0  # Wrong value
-        mock_bigquery_client.query.return_value.result.return_value = [mock_result]
+    def test_dataset_not_found(self, fake_bigquery):
+        """Test when the configured dataset does not exist."""
+        fake_bigquery(error=NotFound("Dataset test-project:test_dataset was not found"))
 
-        result = check_bigquery_connection()
+        result = check_bigquery_connection(deep=True)
 
         assert result["status"] == "unhealthy"
-        assert "unexpected result" in result["message"].lower()
+        assert "not found" in result["message"].lower()
+        assert "error" in result
+
+    def test_shallow_check_skips_query(self, fake_bigquery):
+        """Test that the default shallow check does not touch BigQuery."""
+        client = fake_bigquery()
+
+        result = check_bigquery_connection(deep=False)
+
+        assert result["status"] == "healthy"
+        assert result["project_id"] == "test-project"
+        assert client.calls == 0
+
+    def test_healthy_probe_cached(self, fake_bigquery):
+        """Test that a healthy deep probe is reused within the TTL."""
+        client = fake_bigquery()
+
+        first = check_bigquery_connection(deep=True)
+        second = check_bigquery_connection(deep=True)
+
+        assert first["status"] == "healthy"
+        assert second == first
+        assert client.calls == 1
+
+        # Callers get copies, so mutating one must not leak into the cache
+        second["extra"] = "caller-added"
+        assert "extra" not in check_bigquery_connection(deep=True)
+
+    def test_failed_probe_not_cached(self, fake_bigquery):
+        """Test that a failed deep probe is retried on the next call."""
+        client = fake_bigquery(error=Exception("Connection refused"))
+
+        check_bigquery_connection(deep=True)
+        check_bigquery_connection(deep=True)
+
+        assert client.calls == 2
 
 
 class TestGetSystemHealth:
     """Test overall system health check."""
 
-    def test_all_healthy(self, mock_bigquery_client):
+    def test_all_healthy(self, fake_bigquery):
         """Test when all components are healthy."""
-        # Mock successful BigQuery connection
-        mock_result = MagicMock()
-        mock_result.health_check = 1
-        mock_bigquery_client.query.return_value.result.return_value = [mock_result]
+        fake_bigquery()
 
-        result = get_system_health()
+        result = get_system_health(deep=True)
 
         assert result["status"] == "healthy"
         assert "components" in result
         assert result["components"]["configuration"]["status"] == "healthy"
         assert result["components"]["bigquery"]["status"] == "healthy"
 
-    def test_bigquery_unhealthy(self, mock_bigquery_client):
+    def test_bigquery_unhealthy(self, fake_bigquery):
         """Test when BigQuery is unhealthy."""
-        # Mock BigQuery connection error
-        mock_bigquery_client.query.side_effect = Exception("Connection error")
+        fake_bigquery(error=Exception("Connection error"))
 
-        result = get_system_health()
+        result = get_system_health(deep=True)
 
         assert result["status"] == "unhealthy"
         assert result["components"]["configuration"]["status"] == "healthy"
         assert result["components"]["bigquery"]["status"] == "unhealthy"
 
-    def test_configuration_unhealthy(self, monkeypatch, mock_bigquery_client):
+    def test_configuration_unhealthy(self, monkeypatch, fake_bigquery):
         """Test when configuration is unhealthy."""
         # Remove required config
         monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", "")
 
-        # Mock successful BigQuery (won't be reached due to config failure)
-        mock_result = MagicMock()
-        mock_result.health_check = 1
-        mock_bigquery_client.query.return_value.result.return_value = [mock_result]
+        # Successful BigQuery (won't be reached due to config failure)
+        client = fake_bigquery()
 
-        result = get_system_health()
+        result = get_system_health(deep=True)
 
         assert result["status"] == "unhealthy"
         assert result["components"]["configuration"]["status"] == "unhealthy"
+        assert result["components"]["bigquery"]["status"] == "skipped"
+        assert client.calls == 0
 
-    def test_all_unhealthy(self, monkeypatch, mock_bigquery_client):
+    def test_all_unhealthy(self, monkeypatch, fake_bigquery):
         """Test when all components are unhealthy."""
         # Remove required config
         monkeypatch.setenv("BIGQUERY_PROJECT_ID", "")
 
-        # Mock BigQuery connection error
-        mock_bigquery_client.query.side_effect = Exception("Connection error")
+        fake_bigquery(error=Exception("Connection error"))
 
-        result = get_system_health()
+        result = get_system_health(deep=True)
 
+        # BigQuery is not probed once configuration is known to be broken
         assert result["status"] == "unhealthy"
         assert result["components"]["configuration"]["status"] == "unhealthy"
-        assert result["components"]["bigquery"]["status"] == "unhealthy"
+        assert result["components"]["bigquery"]["status"] == "skipped"
@@ -4,21 +4,93 @@ Tests job lifecycle operations including job creation, status retrieval,
 and statistics management. These are the entry points for the pipeline.
 """
 
-from unittest.mock import MagicMock, patch
+import math
 
 import pytest
 from google.cloud import bigquery
 
 from src.models.schemas import JobParams
 from src.operations.job_ops import (
+    INSERT_CHUNK_SIZE,
+    MAX_QUERY_PARAMETERS,
+    bootstrap_job,
+    clear_mark_job_done_cache,
+    clear_zips_for_state_cache,
     create_job,
+    create_jobs,
     get_job_stats,
     get_job_status,
     get_running_jobs,
+    get_running_jobs_with_status,
     get_zips_for_state,
     mark_job_done,
     update_job_stats,
 )
+from src.operations.query_ops import MERGE_CHUNK_SIZE
+from tests.helpers import assert_contains_all
+
+# Validated once at import; create_job only reads its params, so tests share it
+STANDARD_JOB_PARAMS = JobParams(
+    keyword="bars",
+    state="AZ",
+    pages=3,
+    batch_size=100,
+    concurrency=20,
+    dry_run=False
+)
+
+
+def assert_params(parameters, **expected):
+    """Assert each named query parameter has the expected (type_, value).
+
+    Values must also match in Python type, so True never passes for 1.
+    """
+    actual = {p.name: (p.type_, p.value) for p in parameters}
+    mismatched = {
+        name: actual.get(name)
+        for name, want in expected.items()
+        if actual.get(name) != want or type(actual[name][1]) is not type(want[1])
+    }
+    assert not mismatched, f"parameters differ from {expected}: {mismatched}"
+
+
+# Fragments the get_job_stats SELECT must contain (each totals field unpacked)
+GET_JOB_STATS_SQL_TOKENS = (
+    "SELECT", "FROM", "serper_jobs", "WHERE job_id = @job_id",
+    "totals.zips AS zips", "totals.queries AS queries",
+    "totals.successes AS successes", "totals.failures AS failures",
+    "totals.places AS places", "totals.credits AS credits",
+)
+
+# serper_jobs rows for running jobs, shaped like get_running_jobs() results
+RUNNING_JOB_ROWS = [
+    {"job_id": "job-1", "keyword": "bars", "state": "AZ",
+     "pages": 3, "batch_size": 100, "concurrency": 20},
+    {"job_id": "job-2", "keyword": "restaurants", "state": "CA",
+     "pages": 3, "batch_size": 150, "concurrency": 30},
+    {"job_id": "job-3", "keyword": "cafes", "state": "NY",
+     "pages": 2, "batch_size": 50, "concurrency": 10},
+]
+
+# Fragments the bootstrap_job script must contain
+BOOTSTRAP_JOB_SQL_TOKENS = (
+    "BEGIN TRANSACTION;", "COMMIT TRANSACTION;",
+    "INSERT INTO", "serper_jobs", "MERGE", "serper_queries",
+    "UNNEST(@queries_0)", "WHEN NOT MATCHED THEN", "@@row_count",
+)
+
+# Fragments the create_job INSERT must contain
+CREATE_JOB_SQL_TOKENS = (
+    "INSERT INTO", "serper_jobs",
+    # Column list
+    "job_id", "keyword", "state", "pages", "dry_run", "batch_size",
+    "concurrency", "status", "created_at", "started_at", "totals",
+    # created_at / started_at default to now
+    "CURRENT_TIMESTAMP()",
+    # totals STRUCT initialized to zeros
+    "STRUCT(", "0 AS zips", "0 AS queries", "0 AS successes",
+    "0 AS failures", "0 AS places", "0 AS credits",
+)
 
 
 class TestCreateJob:
@@ -29,24 +101,19 @@ class TestCreateJob:
     and return the right structure for downstream processing.
     """
 
+    @pytest.fixture(autouse=True)
+    def _insert_succeeds(self, mock_execute_dml):
+        """Every test here starts from a successful insert (1 row affected)."""
+        mock_execute_dml.return_value = 1
+
     def test_create_job_happy_path_standard(self, mock_execute_dml):
         """Test successful creation of a standard (non-dry-run) job.
 
         This is the most common case: create a job with standard parameters
         and verify it's inserted into BigQuery with status='running'.
         """
-        # Arrange: Create standard job parameters
-        params = JobParams(
-            keyword="bars",
-            state="AZ",
-            pages=3,
-            batch_size=100,
-            concurrency=20,
-            dry_run=False
-        )
-
-        # Mock successful insert (1 row affected)
-        mock_execute_dml.return_value = 1
+        # Arrange: Standard job parameters
+        params = STANDARD_JOB_PARAMS
 
         # Act: Create job
         result = create_job(job_id="test-job-123", params=params)
@@ -58,38 +125,13 @@ class TestCreateJob:
         call_args = mock_execute_dml.call_args
         query = call_args[0][0]  # First positional arg is the query
 
-        # Verify INSERT INTO statement
-        assert "INSERT INTO" in query
-        assert "serper_jobs" in query
-
-        # Verify column list
-        assert "job_id" in query
-        assert "keyword" in query
-        assert "state" in query
-        assert "pages" in query
-        assert "dry_run" in query
-        assert "batch_size" in query
-        assert "concurrency" in query
-        assert "status" in query
-        assert "created_at" in query
-        assert "started_at" in query
-        assert "totals" in query
+        # Verify INSERT INTO statement, column list, CURRENT_TIMESTAMP() for
+        # created_at/started_at, and the zeroed totals STRUCT
+        assert_contains_all(query, CREATE_JOB_SQL_TOKENS)
 
         # Verify status is hardcoded to 'running' (not parameterized)
         assert "'running'" in query or "\"running\"" in query
 
-        # Verify CURRENT_TIMESTAMP() is used for created_at and started_at
-        assert "CURRENT_TIMESTAMP()" in query
-
-        # Verify totals STRUCT is initialized to zeros
-        assert "STRUCT(" in query
-        assert "0 AS zips" in query
-        assert "0 AS queries" in query
-        assert "0 AS successes" in query
-        assert "0 AS failures" in query
-        assert "0 AS places" in query
-        assert "0 AS credits" in query
-
         # Assert: Verify return value structure
         assert isinstance(result, dict)
         assert result["job_id"] == "test-job-123"
@@ -116,9 +158,6 @@ class TestCreateJob:
             dry_run=True
         )
 
-        # Mock successful insert
-        mock_execute_dml.return_value = 1
-
         # Act: Create job
         create_job(job_id="param-test-job", params=params)
 
@@ -132,214 +171,84 @@ class TestCreateJob:
         # Verify correct number of parameters (7 total)
         assert len(parameters) == 7
 
-        # Build parameter dict for easier assertions
-        param_dict = {p.name: (p.type_, p.value) for p in parameters}
-
-        # Assert: job_id parameter
-        assert "job_id" in param_dict
-        assert param_dict["job_id"][0] == "STRING"
-        assert param_dict["job_id"][1] == "param-test-job"
-
-        # Assert: keyword parameter
-        assert "keyword" in param_dict
-        assert param_dict["keyword"][0] == "STRING"
-        assert param_dict["keyword"][1] == "test-keyword"
-
-        # Assert: state parameter
-        assert "state" in param_dict
-        assert param_dict["state"][0] == "STRING"
-        assert param_dict["state"][1] == "CA"
-
-        # Assert: pages parameter
-        assert "pages" in param_dict
-        assert param_dict["pages"][0] == "INT64"
-        assert param_dict["pages"][1] == 5
-
-        # Assert: dry_run parameter
-        assert "dry_run" in param_dict
-        assert param_dict["dry_run"][0] == "BOOL"
-        assert param_dict["dry_run"][1] is True
-
-        # Assert: batch_size parameter
-        assert "batch_size" in param_dict
-        assert param_dict["batch_size"][0] == "INT64"
-        assert param_dict["batch_size"][1] == 50
-
-        # Assert: concurrency parameter
-        assert "concurrency" in param_dict
-        assert param_dict["concurrency"][0] == "INT64"
-        assert param_dict["concurrency"][1] == 10
-
-    def test_create_job_dry_run_false(self, mock_execute_dml):
-        """Test job creation with dry_run=False (production mode).
-
-        Verify that the dry_run parameter is correctly set to False
-        when creating a production job.
-        """
-        # Arrange: Create production job (dry_run=False)
-        params = JobParams(
-            keyword="restaurants",
-            state="NY",
-            pages=3,
-            batch_size=150,
-            concurrency=30,
-            dry_run=False  # Production mode
-        )
-
-        # Mock successful insert
-        mock_execute_dml.return_value = 1
-
-        # Act: Create job
-        create_job(job_id="prod-job-456", params=params)
-
-        # Assert: Verify dry_run parameter is False
-        parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
-
-        assert param_dict["dry_run"] is False
-
-    def test_create_job_dry_run_true(self, mock_execute_dml):
-        """Test job creation with dry_run=True (test mode).
-
-        Verify that the dry_run parameter is correctly set to True
-        when creating a test/simulation job.
-        """
-        # Arrange: Create dry-run job
-        params = JobParams(
-            keyword="cafes",
-            state="TX",
-            pages=2,
-            batch_size=50,
-            concurrency=10,
-            dry_run=True  # Test mode
+        # Assert: each parameter has the right BigQuery type and value
+        assert_params(
+            parameters,
+            job_id=("STRING", "param-test-job"),
+            keyword=("STRING", "test-keyword"),
+            state=("STRING", "CA"),
+            pages=("INT64", 5),
+            dry_run=("BOOL", True),
+            batch_size=("INT64", 50),
+            concurrency=("INT64", 10),
         )
 
-        # Mock successful insert
-        mock_execute_dml.return_value = 1
-
-        # Act: Create job
-        create_job(job_id="dryrun-job-789", params=params)
-
-        # Assert: Verify dry_run parameter is True
-        parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
-
-        assert param_dict["dry_run"] is True
-
-    def test_create_job_state_uppercase_conversion(self, mock_execute_dml):
-        """Test that state codes are converted to uppercase.
-
-        The JobParams validator should uppercase state codes, but verify
-        this happens correctly in the create_job flow.
-        """
-        # Arrange: Create job with lowercase state (will be uppercased by validator)
-        params = JobParams(
-            keyword="bars",
-            state="az",  # Lowercase - should be converted to "AZ"
-            pages=3,
-            batch_size=100,
-            concurrency=20,
-            dry_run=False
-        )
-
-        # Mock successful insert
-        mock_execute_dml.return_value = 1
-
-        # Act: Create job
-        create_job(job_id="state-test-job", params=params)
-
-        # Assert: Verify state was uppercased
-        parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
-
-        assert param_dict["state"] == "AZ"
-
-    def test_create_job_default_parameters(self, mock_execute_dml):
-        """Test job creation with default parameter values.
-
-        JobParams has defaults for pages, batch_size, concurrency, and dry_run.
-        Verify these defaults are correctly applied when not specified.
-        """
-        # Arrange: Create job with only required params (keyword and state)
-        # All other params should use defaults from JobParams
-        params = JobParams(
-            keyword="hotels",
-            state="FL"
-            # pages=3 (default)
-            # batch_size=100 (default)
-            # concurrency=20 (default)
-            # dry_run=False (default)
-        )
-
-        # Mock successful insert
-        mock_execute_dml.return_value = 1
-
-        # Act: Create job
-        create_job(job_id="defaults-job-999", params=params)
-
-        # Assert: Verify default values were used
-        parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
-
-        assert param_dict["pages"] == 3  # Default from JobParams
-        assert param_dict["batch_size"] == 100  # Default from JobParams
-        assert param_dict["concurrency"] == 20  # Default from JobParams
-        assert param_dict["dry_run"] is False  # Default from JobParams
-
-    def test_create_job_sql_injection_protection(self, mock_execute_dml):
-        """Test that parameterized queries prevent SQL injection.
+    @pytest.mark.parametrize(
+        "job_id,job_kwargs,expected",
+        [
+            pytest.param(
+                "prod-job-456",
+                {"keyword": "restaurants", "state": "NY", "pages": 3,
+                 "batch_size": 150, "concurrency": 30, "dry_run": False},
+                {"dry_run": ("BOOL", False)},
+                id="dry_run_false",
+            ),
+            pytest.param(
+                "dryrun-job-789",
+                {"keyword": "cafes", "state": "TX", "pages": 2,
+                 "batch_size": 50, "concurrency": 10, "dry_run": True},
+                {"dry_run": ("BOOL", True)},
+                id="dry_run_true",
+            ),
+            pytest.param(
+                "state-test-job",
+                {"keyword": "bars", "state": "az"},  # Uppercased by the validator
+                {"state": ("STRING", "AZ")},
+                id="state_uppercase_conversion",
+            ),
+            pytest.param(
+                "defaults-job-999",
+                {"keyword": "hotels", "state": "FL"},  # JobParams defaults for the rest
+                {"pages": ("INT64", 3), "batch_size": ("INT64", 100),
+                 "concurrency": ("INT64", 20), "dry_run": ("BOOL", False)},
+                id="default_parameters",
+            ),
+            pytest.param(
+                "test'; DELETE FROM serper_jobs WHERE '1'='1",
+                {"keyword": "bars'; DROP TABLE serper_jobs; --", "state": "CA"},
+                # Malicious strings are bound as parameter values, never spliced into SQL
+                {"job_id": ("STRING", "test'; DELETE FROM serper_jobs WHERE '1'='1"),
+                 "keyword": ("STRING", "bars'; DROP TABLE serper_jobs; --")},
+                id="sql_injection_protection",
+            ),
+        ],
+    )
+    def test_create_job_parameter_values(self, mock_execute_dml, job_id, job_kwargs, expected):
+        """Test that JobParams values reach BigQuery as the expected query parameters.
 
-        Verify that even if malicious strings are provided, they are safely
-        parameterized and cannot inject SQL commands.
+        Covers dry_run both ways, state uppercasing, JobParams defaults, and
+        SQL injection attempts (which must stay plain parameter values).
         """
-        # Arrange: Create job with SQL injection attempt in keyword
-        params = JobParams(
-            keyword="bars'; DROP TABLE serper_jobs; --",
-            state="CA",
-            pages=3,
-            batch_size=100,
-            concurrency=20,
-            dry_run=False
-        )
-
-        # Mock successful insert
-        mock_execute_dml.return_value = 1
+        # Arrange
+        params = JobParams(**job_kwargs)
 
-        # Act: Create job with malicious job_id
-        create_job(
-            job_id="test'; DELETE FROM serper_jobs WHERE '1'='1",
-            params=params
-        )
+        # Act
+        create_job(job_id=job_id, params=params)
 
-        # Assert: Verify parameters are safely parameterized
+        # Assert: parameters are ScalarQueryParameters with the expected values
         parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
-
-        # The malicious strings should be safely stored as parameter values
-        assert param_dict["job_id"] == "test'; DELETE FROM serper_jobs WHERE '1'='1"
-        assert param_dict["keyword"] == "bars'; DROP TABLE serper_jobs; --"
-
-        # Verify parameters are ScalarQueryParameter objects (safe)
         assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in parameters)
 
+        assert_params(parameters, **expected)
+
     def test_create_job_return_value_structure(self, mock_execute_dml):
         """Test that the return value has the correct structure.
 
         The return dict must have exactly: job_id, status, and created_at.
         This contract is relied upon by the CLI and other callers.
         """
-        # Arrange: Create standard job
-        params = JobParams(
-            keyword="gyms",
-            state="WA",
-            pages=3,
-            batch_size=100,
-            concurrency=20,
-            dry_run=False
-        )
-
-        # Mock successful insert
-        mock_execute_dml.return_value = 1
+        # Arrange: Standard job parameters
+        params = STANDARD_JOB_PARAMS
 
         # Act: Create job
         result = create_job(job_id="return-test-job", params=params)
@@ -372,18 +281,8 @@ class TestCreateJob:
         The status is hardcoded to 'running' in the SQL, not parameterized.
         This is by design - all new jobs start as 'running'.
         """
-        # Arrange: Create job
-        params = JobParams(
-            keyword="parks",
-            state="OR",
-            pages=3,
-            batch_size=100,
-            concurrency=20,
-            dry_run=False
-        )
-
-        # Mock successful insert
-        mock_execute_dml.return_value = 1
+        # Arrange: Standard job parameters
+        params = STANDARD_JOB_PARAMS
 
         # Act: Create job
         result = create_job(job_id="status-test-job", params=params)
@@ -403,6 +302,182 @@ class TestCreateJob:
         assert "status" not in param_names
 
 
+class TestCreateJobs:
+    """Test bulk job creation.
+
+    create_jobs must insert many jobs with one multi-row INSERT per chunk,
+    binding each row's values under its own suffixed parameter names.
+    """
+
+    def test_create_jobs_single_multi_row_insert(self, mock_execute_dml):
+        """Test that several jobs are inserted with one DML call."""
+        mock_execute_dml.return_value = 3
+        jobs = [
+            ("bulk-job-0", STANDARD_JOB_PARAMS),
+            ("bulk-job-1", JobParams(keyword="cafes", state="TX", pages=2)),
+            ("bulk-job-2", JobParams(keyword="gyms", state="WA", dry_run=True)),
+        ]
+
+        result = create_jobs(jobs)
+
+        assert mock_execute_dml.call_count == 1
+        query, parameters = mock_execute_dml.call_args[0]
+        assert "INSERT INTO" in query
+        assert query.count("STRUCT(") == 3
+        assert query.count("'running'") == 3
+        assert len(parameters) == 7 * 3
+        assert all(p.name.rsplit("_", 1)[-1] in ("0", "1", "2") for p in parameters)
+
+        assert_params(
+            parameters,
+            job_id_1=("STRING", "bulk-job-1"),
+            keyword_1=("STRING", "cafes"),
+            pages_1=("INT64", 2),
+            dry_run_2=("BOOL", True),
+            state_2=("STRING", "WA"),
+        )
+
+        assert [job["job_id"] for job in result] == ["bulk-job-0", "bulk-job-1", "bulk-job-2"]
+        assert all(job["status"] == "running" for job in result)
+
+    def test_create_jobs_chunks_large_batches(self, mock_execute_dml):
+        """Test that more than INSERT_CHUNK_SIZE jobs are split across inserts."""
+        mock_execute_dml.return_value = 1
+        jobs = [(f"bulk-job-{i}", STANDARD_JOB_PARAMS) for i in range(INSERT_CHUNK_SIZE + 1)]
+
+        result = create_jobs(jobs)
+
+        assert mock_execute_dml.call_count == 2
+        first_params = mock_execute_dml.call_args_list[0][0][1]
+        second_query, second_params = mock_execute_dml.call_args_list[1][0]
+        assert len(first_params) == 7 * INSERT_CHUNK_SIZE
+        assert second_query.count("STRUCT(") == 1
+        assert_params(second_params, job_id_0=("STRING", f"bulk-job-{INSERT_CHUNK_SIZE}"))
+        assert len(result) == INSERT_CHUNK_SIZE + 1
+
+    def test_create_jobs_respects_param_quota(self, mock_execute_dml):
+        """Test that no insert exceeds BigQuery's query parameter limit."""
+        mock_execute_dml.return_value = INSERT_CHUNK_SIZE
+        jobs = [(f"bulk-job-{i}", STANDARD_JOB_PARAMS) for i in range(3000)]
+
+        create_jobs(jobs)
+
+        assert mock_execute_dml.call_count == math.ceil(3000 / INSERT_CHUNK_SIZE)
+        for call in mock_execute_dml.call_args_list:
+            assert len(call[0][1]) <= MAX_QUERY_PARAMETERS
+
+    def test_create_jobs_reuses_statement_per_chunk_size(self, mock_execute_dml):
+        """Test that equal-sized chunks send the same prebuilt INSERT string."""
+        mock_execute_dml.return_value = INSERT_CHUNK_SIZE
+        jobs = [(f"bulk-job-{i}", STANDARD_JOB_PARAMS) for i in range(2 * INSERT_CHUNK_SIZE)]
+
+        create_jobs(jobs)
+
+        first_query, second_query = (call[0][0] for call in mock_execute_dml.call_args_list)
+        assert first_query is second_query
+
+    def test_create_jobs_empty(self, mock_execute_dml):
+        """Test that no insert runs for an empty job list."""
+        assert create_jobs([]) == []
+        assert mock_execute_dml.call_count == 0
+
+
+class TestBootstrapJob:
+    """Test combined job creation + query enqueue in one BigQuery script.
+
+    bootstrap_job replaces the create_job + enqueue_queries round-trips at
+    job startup. It must insert the job, MERGE the queue idempotently, and
+    report how many queries were newly enqueued.
+    """
+
+    def test_bootstrap_job_single_script(self, mock_bigquery_client, sample_bigquery_row):
+        """Test that job insert and queue MERGE are submitted as one script."""
+        # Arrange: the script's final SELECT reports 2 queries enqueued
+        queries = [
+            {"zip": "85001", "page": 1, "q": "85001 bars"},
+            {"zip": "85001", "page": 2, "q": "85001 bars"},
+        ]
+        script_job = mock_bigquery_client.query.return_value
+        script_job.result.return_value = [sample_bigquery_row(queries_enqueued=2)]
+
+        # Act
+        result = bootstrap_job(job_id="boot-job", params=STANDARD_JOB_PARAMS, queries=queries)
+
+        # Assert: one round-trip, transactional script, never served from cache
+        assert mock_bigquery_client.query.call_count == 1
+        script = mock_bigquery_client.query.call_args[0][0]
+        job_config = mock_bigquery_client.query.call_args[1]["job_config"]
+        assert job_config.use_query_cache is False
+        assert_contains_all(script, BOOTSTRAP_JOB_SQL_TOKENS)
+
+        # Assert: job row uses the create_job parameters; queries are one struct array
+        parameters = job_config.query_parameters
+        assert_params(
+            [p for p in parameters if isinstance(p, bigquery.ScalarQueryParameter)],
+            job_id=("STRING", "boot-job"),
+            state=("STRING", "AZ"),
+            pages=("INT64", 3),
+            dry_run=("BOOL", False),
+        )
+        queries_param = {p.name: p for p in parameters}["queries_0"]
+        assert isinstance(queries_param, bigquery.ArrayQueryParameter)
+        assert [v.struct_values for v in queries_param.values] == queries
+
+        # Assert: return structure
+        assert result["job_id"] == "boot-job"
+        assert result["status"] == "running"
+        assert result["queries_enqueued"] == 2
+        assert "T" in result["created_at"]
+
+    def test_bootstrap_job_count_selected_after_commit(self, mock_bigquery_client):
+        """Test that the enqueued count is read by the script's last statement.
+
+        A script job returns the rows of its last statement, so the count must
+        be SELECTed after COMMIT rather than before it.
+        """
+        # Arrange
+        mock_bigquery_client.query.return_value.result.return_value = []
+
+        # Act
+        result = bootstrap_job(job_id="shape-job", params=STANDARD_JOB_PARAMS,
+                               queries=[{"zip": "85001", "page": 1, "q": "85001 bars"}])
+
+        # Assert: DECLARE first, count accumulated per MERGE, SELECT last
+        statements = [
+            stmt.strip() for stmt in mock_bigquery_client.query.call_args[0][0].split(";")
+            if stmt.strip()
+        ]
+        assert statements[0] == "DECLARE queries_enqueued INT64 DEFAULT 0"
+        assert statements[-2] == "COMMIT TRANSACTION"
+        assert statements[-1] == "SELECT queries_enqueued"
+        assert "SET queries_enqueued = queries_enqueued + @@row_count" in statements
+
+        # Assert: no rows back means nothing was counted
+        assert result["queries_enqueued"] == 0
+
+    def test_bootstrap_job_chunks_queries(self, mock_bigquery_client):
+        """Test that queries are paged into MERGE_CHUNK_SIZE arrays, one MERGE each."""
+        # Arrange
+        queries = [
+            {"zip": f"{85000 + i}", "page": 1, "q": f"{85000 + i} bars"}
+            for i in range(MERGE_CHUNK_SIZE + 1)
+        ]
+        mock_bigquery_client.query.return_value.result.return_value = []
+
+        # Act
+        bootstrap_job(job_id="chunk-job", params=STANDARD_JOB_PARAMS, queries=queries)
+
+        # Assert: two arrays, two MERGEs, all in one script
+        assert mock_bigquery_client.query.call_count == 1
+        script = mock_bigquery_client.query.call_args[0][0]
+        parameters = mock_bigquery_client.query.call_args[1]["job_config"].query_parameters
+        arrays = {p.name: len(p.values) for p in parameters
+                  if isinstance(p, bigquery.ArrayQueryParameter)}
+        assert arrays == {"queries_0": MERGE_CHUNK_SIZE, "queries_1": 1}
+        assert script.count("MERGE") == 2
+        assert "UNNEST(@queries_0)" in script and "UNNEST(@queries_1)" in script
+
+
 class TestGetZipsForState:
     """Test retrieving zip codes for a state from reference table.
 
@@ -487,6 +562,32 @@ class TestGetZipsForState:
         # Assert: Returns empty list
         assert result == []
 
+    def test_get_zips_cached_per_state(self, mock_execute_query, sample_bigquery_row):
+        """Test that repeated lookups for a state reuse the cached result.
+
+        Reference data changes rarely, so a second call (in any letter case)
+        must not hit BigQuery again, and the returned list must be a copy.
+        """
+        # Arrange: Mock 2 zip codes
+        mock_execute_query.return_value = [
+            sample_bigquery_row(zip="85001"),
+            sample_bigquery_row(zip="85002"),
+        ]
+
+        # Act: Look up the same state twice, mutating the first result
+        first = get_zips_for_state(state="AZ")
+        first.append("99999")
+        second = get_zips_for_state(state="az")
+
+        # Assert: Only one query, and the cache was not mutated
+        assert mock_execute_query.call_count == 1
+        assert second == ["85001", "85002"]
+
+        # Act: Clearing the cache forces a fresh query
+        clear_zips_for_state_cache()
+        get_zips_for_state(state="AZ")
+        assert mock_execute_query.call_count == 2
+
 
 class TestUpdateJobStats:
     """Test recalculating and updating job statistics.
@@ -601,16 +702,7 @@ class TestGetJobStats:
         parameters = mock_execute_query.call_args[0][1]
 
         # Assert: Query structure
-        assert "SELECT" in query
-        assert "totals.zips AS zips" in query
-        assert "totals.queries AS queries" in query
-        assert "totals.successes AS successes" in query
-        assert "totals.failures AS failures" in query
-        assert "totals.places AS places" in query
-        assert "totals.credits AS credits" in query
-        assert "FROM" in query
-        assert "serper_jobs" in query
-        assert "WHERE job_id = @job_id" in query
+        assert_contains_all(query, GET_JOB_STATS_SQL_TOKENS)
 
         # Assert: Parameter validation
         assert len(parameters) == 1
@@ -748,32 +840,7 @@ class TestGetRunningJobs:
         job metadata needed for batch processing.
         """
         # Arrange: Mock 3 running jobs
-        mock_rows = [
-            sample_bigquery_row(
-                job_id="job-1",
-                keyword="bars",
-                state="AZ",
-                pages=3,
-                batch_size=100,
-                concurrency=20
-            ),
-            sample_bigquery_row(
-                job_id="job-2",
-                keyword="restaurants",
-                state="CA",
-                pages=3,
-                batch_size=150,
-                concurrency=30
-            ),
-            sample_bigquery_row(
-                job_id="job-3",
-                keyword="cafes",
-                state="NY",
-                pages=2,
-                batch_size=50,
-                concurrency=10
-            ),
-        ]
+        mock_rows = [sample_bigquery_row(**job) for job in RUNNING_JOB_ROWS]
         mock_execute_query.return_value = mock_rows
 
         # Act: Get running jobs
@@ -796,14 +863,8 @@ class TestGetRunningJobs:
         # Assert: No parameters (status is hardcoded)
         assert len(parameters) == 0
 
-        # Assert: Return value is list of job dicts
-        assert len(result) == 3
-        assert result[0]["job_id"] == "job-1"
-        assert result[0]["keyword"] == "bars"
-        assert result[1]["job_id"] == "job-2"
-        assert result[1]["state"] == "CA"
-        assert result[2]["job_id"] == "job-3"
-        assert result[2]["batch_size"] == 50
+        # Assert: Return value is one job dict per row, in query order
+        assert result == RUNNING_JOB_ROWS
 
     def test_get_running_jobs_no_jobs(self, mock_execute_query):
         """Test behavior when no jobs are running.
@@ -819,6 +880,39 @@ class TestGetRunningJobs:
         # Assert: Returns empty list
         assert result == []
 
+    def test_get_running_jobs_with_status_single_query(
+        self, mock_execute_query, sample_bigquery_row
+    ):
+        """Test that all running jobs' full status comes back from one query.
+
+        Replaces get_running_jobs + get_job_status per job (N+1 round-trips).
+        """
+        # Arrange: Mock 2 running jobs with totals
+        totals = {"zips": 2, "queries": 6, "successes": 3, "failures": 0,
+                  "places": 12, "credits": 3}
+        mock_execute_query.return_value = [
+            sample_bigquery_row(
+                job_id=f"job-{i}", keyword="bars", state="AZ", pages=3, dry_run=False,
+                concurrency=20, status="running", created_at=None, started_at=None,
+                finished_at=None, totals=totals if i == 1 else None
+            )
+            for i in (1, 2)
+        ]
+
+        # Act
+        result = get_running_jobs_with_status()
+
+        # Assert: one query filtered on running jobs
+        assert mock_execute_query.call_count == 1
+        query = mock_execute_query.call_args[0][0]
+        assert "WHERE status = 'running'" in query
+        assert "totals" in query
+
+        # Assert: get_job_status format, missing totals default to zeros
+        assert [job["job_id"] for job in result] == ["job-1", "job-2"]
+        assert result[0]["totals"] == totals
+        assert result[1]["totals"]["queries"] == 0
+
 
 class TestMarkJobDone:
     """Test marking a job as completed.
@@ -876,3 +970,40 @@ class TestMarkJobDone:
 
         # Assert: execute_dml was called (operation attempted)
         assert mock_execute_dml.call_count == 1
+
+    def test_mark_job_done_double_call_hits_cache(self, mock_execute_dml):
+        """Test that marking the same job done twice runs the UPDATE once."""
+        mock_execute_dml.return_value = 1
+
+        mark_job_done(job_id="twice-done-job")
+        mark_job_done(job_id="twice-done-job")
+
+        assert mock_execute_dml.call_count == 1
+
+        # Other jobs, and the same job after a cache clear, still run the UPDATE
+        mark_job_done(job_id="other-done-job")
+        clear_mark_job_done_cache()
+        mark_job_done(job_id="twice-done-job")
+        assert mock_execute_dml.call_count == 3
+
+    def test_mark_job_done_zero_rows_not_cached(self, mock_execute_dml):
+        """Test that an UPDATE matching no row is not remembered as done."""
+        # Arrange: job row not visible yet on the first call, updated on the second
+        mock_execute_dml.side_effect = [0, 1, 1]
+
+        mark_job_done(job_id="late-job")
+        mark_job_done(job_id="late-job")
+        mark_job_done(job_id="late-job")
+
+        # Assert: retried after the 0-row UPDATE, cached after the 1-row one
+        assert mock_execute_dml.call_count == 2
+
+    def test_mark_job_done_failure_not_cached(self, mock_execute_dml):
+        """Test that a failed UPDATE is retried on the next call."""
+        mock_execute_dml.side_effect = [Exception("BigQuery unavailable"), 1]
+
+        with pytest.raises(Exception, match="BigQuery unavailable"):
+            mark_job_done(job_id="retry-done-job")
+        mark_job_done(job_id="retry-done-job")
+
+        assert mock_execute_dml.call_count == 2
@@ -4,13 +4,57 @@ Tests place storage operations including idempotent MERGE logic and chunking.
 These operations are critical for preventing duplicate places in the database.
 """
 
-import json
 from unittest.mock import MagicMock, patch
 
+import orjson
 import pytest
 from google.cloud import bigquery
 
 from src.operations.place_ops import MERGE_CHUNK_SIZE, store_places
+from tests.helpers import assert_contains_all, params_by_name
+
+
+def _make_places(n):
+    """Build n distinct place dicts shaped like fetch_serper_place_task output."""
+    return [
+        {
+            "keyword": "stores",
+            "state": "TX",
+            "zip": f"7500{i % 100:02d}",
+            "page": 1,
+            "place_uid": f"ChIJ{i:05d}",
+            "payload": {"title": f"Store {i}", "address": f"{i} Test St"},
+            "api_status": 200,
+            "results_count": 10,
+            "credits": 1
+        }
+        for i in range(n)
+    ]
+
+
+# Fragments the store_places MERGE must contain
+MERGE_SQL_TOKENS = (
+    "MERGE", "serper_places", "AS target", "AS source",
+    # ON clause (idempotency key)
+    "ON target.job_id = source.job_id",
+    "AND target.place_uid = source.place_uid",
+    "WHEN NOT MATCHED THEN", "INSERT",
+    # INSERT column list
+    "ingest_id", "job_id", "source", "keyword", "state", "zip", "page",
+    "place_uid", "payload", "payload_raw", "api_status", "results_count",
+    "credits",
+)
+
+# Column declarations the UNNEST STRUCT must contain
+STRUCT_DECLARATION_TOKENS = (
+    "STRUCT<",
+    "ingest_id STRING", "job_id STRING", "source STRING",
+    "source_version STRING", "ingest_ts TIMESTAMP", "keyword STRING",
+    "state STRING", "zip STRING", "page INT64", "place_uid STRING",
+    "payload JSON",  # Note: JSON type, not STRING
+    "payload_raw STRING", "api_status INT64", "api_ms INT64",
+    "results_count INT64", "credits INT64", "error STRING",
+)
 
 
 class TestStorePlaces:
@@ -80,38 +124,51 @@ class TestStorePlaces:
         query = call_args[0][0]
         parameters = call_args[0][1]
 
-        # Assert: MERGE statement structure
-        assert "MERGE" in query
-        assert "serper_places" in query
-        assert "AS target" in query
-        assert "AS source" in query
-
-        # Assert: MERGE ON clause (idempotency key)
-        assert "ON target.job_id = source.job_id" in query
-        assert "AND target.place_uid = source.place_uid" in query
-
-        # Assert: WHEN NOT MATCHED THEN INSERT clause
-        assert "WHEN NOT MATCHED THEN" in query
-        assert "INSERT" in query
-
-        # Assert: INSERT includes all required columns
-        assert "ingest_id" in query
-        assert "job_id" in query
-        assert "source" in query
-        assert "keyword" in query
-        assert "state" in query
-        assert "zip" in query
-        assert "page" in query
-        assert "place_uid" in query
-        assert "payload" in query
-        assert "payload_raw" in query
-        assert "api_status" in query
-        assert "results_count" in query
-        assert "credits" in query
+        # Assert: MERGE structure, ON clause and INSERT columns
+        assert_contains_all(query, MERGE_SQL_TOKENS)
 
         # Assert: Function returns rows affected
         assert result == 3
 
+    @pytest.mark.parametrize(
+        "n_places,chunk_rows",
+        [
+            pytest.param(3, [3], id="small_batch"),
+            # No chunking at the limit
+            pytest.param(MERGE_CHUNK_SIZE, [MERGE_CHUNK_SIZE], id="exact_chunk_boundary"),
+            pytest.param(MERGE_CHUNK_SIZE + 1, [MERGE_CHUNK_SIZE, 1], id="over_boundary_by_one"),
+            pytest.param(MERGE_CHUNK_SIZE + 5, [MERGE_CHUNK_SIZE, 5], id="chunking_large_batch"),
+            pytest.param(
+                2 * MERGE_CHUNK_SIZE + 5,
+                [MERGE_CHUNK_SIZE, MERGE_CHUNK_SIZE, 5],
+                id="multiple_full_chunks",
+            ),
+        ],
+    )
+    def test_store_places_batch_sizes(self, mock_execute_dml, n_places, chunk_rows):
+        """Test chunking around MERGE_CHUNK_SIZE (500).
+
+        Batches up to MERGE_CHUNK_SIZE places go out as one MERGE; larger
+        batches are split into MERGE_CHUNK_SIZE-place chunks to stay under
+        BigQuery's parameter limit, and the rows inserted by each chunk are
+        summed.
+        """
+        # Arrange: Each chunk reports all of its places as newly inserted
+        places = _make_places(n_places)
+        mock_execute_dml.side_effect = chunk_rows
+
+        # Act
+        result = store_places(job_id="batch-size-job", places=places)
+
+        # Assert: one MERGE per chunk, each sized for its rows
+        assert mock_execute_dml.call_count == len(chunk_rows)
+        for call, rows in zip(mock_execute_dml.call_args_list, chunk_rows, strict=True):
+            # 3 shared (job_id, source, source_version) + 14 per place
+            assert len(call[0][1]) == 3 + rows * 14
+
+        # Assert: Total return value is sum of chunks
+        assert result == n_places
+
     def test_store_places_json_hardening_adr_0001(self, mock_execute_dml):
         """Test JSON hardening per ADR-0001.
 
@@ -149,7 +206,7 @@ class TestStorePlaces:
 
         # Assert: Extract query and parameters
         query = mock_execute_dml.call_args[0][0]
-        parameters = mock_execute_dml.call_args[0][1]
+        params = params_by_name(mock_execute_dml.call_args[0][1])
 
         # Assert: payload uses SAFE.PARSE_JSON() for resilience
         assert "SAFE.PARSE_JSON(@payload_0)" in query
@@ -158,67 +215,20 @@ class TestStorePlaces:
         assert "@payload_raw_0" in query
 
         # Assert: Find both parameters in parameters list
-        param_dict = {p.name: p.value for p in parameters}
-        assert "payload_0" in param_dict
-        assert "payload_raw_0" in param_dict
+        assert "payload_0" in params
+        assert "payload_raw_0" in params
 
         # Assert: Both parameters contain the same JSON string
-        payload_param = param_dict["payload_0"]
-        payload_raw_param = param_dict["payload_raw_0"]
+        payload_param = params["payload_0"].value
+        payload_raw_param = params["payload_raw_0"].value
         assert payload_param == payload_raw_param
 
         # Assert: Parameter value is valid JSON string
         assert isinstance(payload_param, str)
-        parsed = json.loads(payload_param)
+        parsed = orjson.loads(payload_param)
         assert parsed["title"] == "Test Restaurant"
         assert parsed["rating"] == 4.5
 
-    def test_store_places_chunking_large_batch(self, mock_execute_dml):
-        """Test automatic chunking for batches > MERGE_CHUNK_SIZE (500).
-
-        When storing >500 places, the function should automatically split
-        into multiple MERGE operations to avoid BigQuery parameter limits.
-        """
-        # Arrange: Create 505 places (requires 2 chunks: 500 + 5)
-        places = []
-        for i in range(505):
-            places.append({
-                "keyword": "stores",
-                "state": "TX",
-                "zip": f"7500{i % 100:02d}",
-                "page": 1,
-                "place_uid": f"ChIJ{i:05d}",
-                "payload": {"title": f"Store {i}", "address": f"{i} Test St"},
-                "api_status": 200,
-                "results_count": 10,
-                "credits": 1
-            })
-
-        # Mock: First chunk inserts 500, second chunk inserts 5
-        mock_execute_dml.side_effect = [500, 5]
-
-        # Act: Store large batch
-        result = store_places(job_id="chunk-test-job", places=places)
-
-        # Assert: execute_dml called exactly twice
-        assert mock_execute_dml.call_count == 2
-
-        # Assert: First call - 500 places
-        first_call_params = mock_execute_dml.call_args_list[0][0][1]
-        # Count parameters: 3 shared (job_id, source, source_version) + 14 per place
-        # For 500 places: 3 + (500 * 14) = 7003 parameters
-        first_call_param_count = len(first_call_params)
-        assert first_call_param_count == 3 + (500 * 14)
-
-        # Assert: Second call - 5 places
-        second_call_params = mock_execute_dml.call_args_list[1][0][1]
-        # For 5 places: 3 + (5 * 14) = 73 parameters
-        second_call_param_count = len(second_call_params)
-        assert second_call_param_count == 3 + (5 * 14)
-
-        # Assert: Total return value is sum of chunks
-        assert result == 505  # 500 + 5
-
     def test_store_places_empty_list(self, mock_execute_dml):
         """Test storing an empty list of places.
 
@@ -302,99 +312,31 @@ class TestStorePlaces:
         store_places(job_id="types-test-job", places=places)
 
         # Assert: Extract parameters
-        parameters = mock_execute_dml.call_args[0][1]
+        params = params_by_name(mock_execute_dml.call_args[0][1])
 
         # Assert: All parameters are ScalarQueryParameter instances
-        assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in parameters)
-
-        # Build parameter dict for type checking
-        param_dict = {p.name: (p.type_, p.value) for p in parameters}
+        assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in params.values())
 
         # Assert: Shared parameter types
-        assert param_dict["job_id"][0] == "STRING"
-        assert param_dict["source"][0] == "STRING"
-        assert param_dict["source_version"][0] == "STRING"
+        assert params["job_id"].type_ == "STRING"
+        assert params["source"].type_ == "STRING"
+        assert params["source_version"].type_ == "STRING"
 
         # Assert: Place-specific parameter types (index 0)
-        assert param_dict["ingest_id_0"][0] == "STRING"
-        assert param_dict["ingest_ts_0"][0] == "TIMESTAMP"
-        assert param_dict["keyword_0"][0] == "STRING"
-        assert param_dict["state_0"][0] == "STRING"
-        assert param_dict["zip_0"][0] == "STRING"
-        assert param_dict["page_0"][0] == "INT64"
-        assert param_dict["place_uid_0"][0] == "STRING"
-        assert param_dict["payload_0"][0] == "STRING"  # JSON as string
-        assert param_dict["payload_raw_0"][0] == "STRING"  # Raw JSON string
-        assert param_dict["api_status_0"][0] == "INT64"
-        assert param_dict["api_ms_0"][0] == "INT64"
-        assert param_dict["results_count_0"][0] == "INT64"
-        assert param_dict["credits_0"][0] == "INT64"
-        assert param_dict["error_0"][0] == "STRING"
-
-    def test_store_places_exact_chunk_boundary(self, mock_execute_dml):
-        """Test behavior at exact chunk boundary (500 places).
-
-        When exactly 500 places are provided, it should use single chunk
-        (no chunking needed, stays within limit).
-        """
-        # Arrange: Create exactly 500 places (at boundary)
-        places = []
-        for i in range(500):
-            places.append({
-                "keyword": "gyms",
-                "state": "FL",
-                "zip": "33101",
-                "page": 1,
-                "place_uid": f"ChIJ_boundary_{i}",
-                "payload": {"title": f"Gym {i}"},
-                "api_status": 200,
-                "results_count": 10,
-                "credits": 1
-            })
-
-        # Mock: All 500 inserted in single operation
-        mock_execute_dml.return_value = 500
-
-        # Act: Store 500 places
-        result = store_places(job_id="boundary-job", places=places)
-
-        # Assert: execute_dml called exactly once (no chunking at boundary)
-        assert mock_execute_dml.call_count == 1
-
-        # Assert: Returns 500
-        assert result == 500
-
-    def test_store_places_over_boundary_by_one(self, mock_execute_dml):
-        """Test behavior just over chunk boundary (501 places).
-
-        When 501 places are provided, it should chunk into 500 + 1.
-        """
-        # Arrange: Create 501 places (1 over boundary)
-        places = []
-        for i in range(501):
-            places.append({
-                "keyword": "pharmacies",
-                "state": "IL",
-                "zip": "60601",
-                "page": 1,
-                "place_uid": f"ChIJ_501_{i}",
-                "payload": {"title": f"Pharmacy {i}"},
-                "api_status": 200,
-                "results_count": 10,
-                "credits": 1
-            })
-
-        # Mock: First chunk 500, second chunk 1
-        mock_execute_dml.side_effect = [500, 1]
-
-        # Act: Store 501 places
-        result = store_places(job_id="501-job", places=places)
-
-        # Assert: execute_dml called exactly twice
-        assert mock_execute_dml.call_count == 2
-
-        # Assert: Returns total 501
-        assert result == 501
+        assert params["ingest_id_0"].type_ == "STRING"
+        assert params["ingest_ts_0"].type_ == "TIMESTAMP"
+        assert params["keyword_0"].type_ == "STRING"
+        assert params["state_0"].type_ == "STRING"
+        assert params["zip_0"].type_ == "STRING"
+        assert params["page_0"].type_ == "INT64"
+        assert params["place_uid_0"].type_ == "STRING"
+        assert params["payload_0"].type_ == "STRING"  # JSON as string
+        assert params["payload_raw_0"].type_ == "STRING"  # Raw JSON string
+        assert params["api_status_0"].type_ == "INT64"
+        assert params["api_ms_0"].type_ == "INT64"
+        assert params["results_count_0"].type_ == "INT64"
+        assert params["credits_0"].type_ == "INT64"
+        assert params["error_0"].type_ == "STRING"
 
     def test_store_places_optional_fields_none(self, mock_execute_dml):
         """Test handling of optional fields when they are None.
@@ -421,15 +363,14 @@ class TestStorePlaces:
         store_places(job_id="minimal-job", places=places)
 
         # Assert: Parameters include None values for optional fields
-        parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
+        params = params_by_name(mock_execute_dml.call_args[0][1])
 
         # Optional fields should be present but with None values
-        assert param_dict.get("api_status_0") is None
-        assert param_dict.get("api_ms_0") is None
-        assert param_dict.get("results_count_0") is None
-        assert param_dict.get("credits_0") is None
-        assert param_dict.get("error_0") is None
+        assert params["api_status_0"].value is None
+        assert params["api_ms_0"].value is None
+        assert params["results_count_0"].value is None
+        assert params["credits_0"].value is None
+        assert params["error_0"].value is None
 
     def test_store_places_struct_declaration(self, mock_execute_dml):
         """Test that STRUCT declaration matches INSERT columns.
@@ -461,21 +402,4 @@ class TestStorePlaces:
         query = mock_execute_dml.call_args[0][0]
 
         # Assert: STRUCT declaration includes all column types
-        assert "STRUCT<" in query
-        assert "ingest_id STRING" in query
-        assert "job_id STRING" in query
-        assert "source STRING" in query
-        assert "source_version STRING" in query
-        assert "ingest_ts TIMESTAMP" in query
-        assert "keyword STRING" in query
-        assert "state STRING" in query
-        assert "zip STRING" in query
-        assert "page INT64" in query
-        assert "place_uid STRING" in query
-        assert "payload JSON" in query  # Note: JSON type, not STRING
-        assert "payload_raw STRING" in query
-        assert "api_status INT64" in query
-        assert "api_ms INT64" in query
-        assert "results_count INT64" in query
-        assert "credits INT64" in query
-        assert "error STRING" in query
+        assert_contains_all(query, STRUCT_DECLARATION_TOKENS)
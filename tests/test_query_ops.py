@@ -4,6 +4,10 @@ Tests the atomic batch dequeue operations and query status management.
 These are critical functions for pipeline resilience and concurrency safety.
 """
 
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, call, patch
 
 import pytest
@@ -19,6 +23,49 @@ from src.operations.query_ops import (
     skip_remaining_pages,
     update_query_status,
 )
+from tests.helpers import assert_contains_all, params_by_name
+
+
+def _zip_param_counts(query):
+    """Count references to each @zip_<i> parameter in one pass over the SQL."""
+    return Counter(re.findall(r"@(zip_\d+)\b", query))
+
+
+# Fragments the dequeue_batch claim UPDATE must contain
+DEQUEUE_CLAIM_SQL_TOKENS = (
+    "UPDATE", "status = 'processing'",
+    "WHERE job_id = @job_id", "AND status = 'queued'",
+)
+
+# Fragments the batch_update_query_statuses MERGE must contain
+BATCH_UPDATE_SQL_TOKENS = (
+    "MERGE", "serper_queries", "AS target", "AS source",
+    # All rows arrive in one struct-array parameter
+    "UNNEST(@updates)",
+    # ON clause (matches on job_id, zip, page)
+    "ON target.job_id = source.job_id",
+    "AND target.zip = source.zip", "AND target.page = source.page",
+    "WHEN MATCHED THEN", "UPDATE SET",
+    # Every status field is updated
+    "status = source.status", "api_status = source.api_status",
+    "results_count = source.results_count", "credits = source.credits",
+    "error = source.error", "ran_at = CURRENT_TIMESTAMP()",
+)
+
+# Fragments the batch_skip_remaining_pages MERGE must contain
+BATCH_SKIP_SQL_TOKENS = (
+    "MERGE", "serper_queries", "AS target", "AS source",
+    # UNNEST of STRUCT rows, declared with column types
+    "UNNEST", "STRUCT<", "job_id STRING", "zip STRING", "page INT64",
+    # ON clause (matches on job_id, zip, page, and status='queued')
+    "ON target.job_id = source.job_id",
+    "AND target.zip = source.zip", "AND target.page = source.page",
+    "AND target.status = 'queued'",
+    "WHEN MATCHED THEN", "UPDATE SET",
+    # Skipped pages are marked with the early-exit reason
+    "status = 'skipped'", "error = 'early_exit_page1_lt10'",
+    "ran_at = CURRENT_TIMESTAMP()",
+)
 
 
 class TestDequeueBatch:
@@ -75,20 +122,17 @@ class TestDequeueBatch:
         dml_params = dml_call_args[0][1]  # Second positional arg is parameters
 
         # Verify UPDATE query contains critical clauses
-        assert "UPDATE" in dml_query
-        assert "SET status = 'processing'" in dml_query
-        assert "WHERE job_id = @job_id" in dml_query
-        assert "AND status = 'queued'" in dml_query
+        assert_contains_all(dml_query, DEQUEUE_CLAIM_SQL_TOKENS)
 
         # Verify parameters are correct ScalarQueryParameter objects
         assert len(dml_params) == 3
 
         # Extract parameter values by name
-        param_dict = {p.name: p.value for p in dml_params}
-        assert param_dict["job_id"] == "test-job-123"
-        assert param_dict["batch_size"] == 10
+        param_dict = params_by_name(dml_params)
+        assert param_dict["job_id"].value == "test-job-123"
+        assert param_dict["batch_size"].value == 10
         assert "claim_id" in param_dict
-        assert param_dict["claim_id"].startswith("claim-")
+        assert param_dict["claim_id"].value.startswith("claim-")
 
         # Assert: Verify SQL parameters passed to execute_query
         select_call_args = mock_execute_query.call_args
@@ -101,9 +145,9 @@ class TestDequeueBatch:
         assert "ORDER BY zip, page" in select_query
 
         # Verify same job_id and claim_id used in both queries
-        select_param_dict = {p.name: p.value for p in select_params}
-        assert select_param_dict["job_id"] == "test-job-123"
-        assert select_param_dict["claim_id"] == param_dict["claim_id"]
+        select_param_dict = params_by_name(select_params)
+        assert select_param_dict["job_id"].value == "test-job-123"
+        assert select_param_dict["claim_id"].value == param_dict["claim_id"].value
 
     def test_dequeue_empty_queue(self, mock_execute_dml, mock_execute_query):
         """Test dequeue when no queries are available.
@@ -130,47 +174,58 @@ class TestDequeueBatch:
         # Assert: execute_query was NOT called (early return optimization)
         assert mock_execute_query.call_count == 0
 
-    def test_dequeue_partial_batch(
-        self, mock_execute_dml, mock_execute_query, sample_bigquery_row
+    @pytest.mark.parametrize(
+        "claimed,batch_size",
+        [
+            pytest.param(10, 10, id="full_batch"),
+            # Near the end of a job: fewer queries queued than requested
+            pytest.param(20, 50, id="partial_batch"),
+            pytest.param(1, 1, id="single_query"),
+        ],
+    )
+    def test_dequeue_returns_claimed_rows(
+        self, mock_execute_dml, mock_execute_query, sample_bigquery_row,
+        claimed, batch_size
     ):
-        """Test dequeue when fewer queries available than requested.
+        """Test that every claimed row comes back as a query dict.
 
-        This is common near the end of a job when only a few queries remain.
-        For example: Request 50, but only 20 are queued.
-
-        Expected behavior: Claim all available (20), return list of 20.
+        Each returned query must have exactly 4 keys: zip, page, q, claim_id.
+        This contract is relied upon by the batch processing flow. All claimed
+        rows are returned, even when fewer than batch_size were available.
         """
-        # Arrange: Request 50, but only 20 available
-        mock_execute_dml.return_value = 20
-
-        # Mock query returns exactly 20 rows
-        mock_rows = [
+        # Arrange: DML claims `claimed` rows, SELECT returns them
+        mock_execute_dml.return_value = claimed
+        mock_execute_query.return_value = [
             sample_bigquery_row(
-                zip=f"8500{i:02d}",
-                page=1,
-                q=f"8500{i:02d} bars",
-                claim_id="claim-partial-789"
+                zip=f"850{i:02d}",
+                page=i % 3 + 1,
+                q=f"850{i:02d} bars",
+                claim_id="claim-rows-123"
             )
-            for i in range(20)
+            for i in range(claimed)
         ]
-        mock_execute_query.return_value = mock_rows
 
-        # Act: Request 50 queries
-        result = dequeue_batch(job_id="test-job-789", batch_size=50)
+        # Act
+        result = dequeue_batch(job_id="rows-job", batch_size=batch_size)
 
-        # Assert: Returns exactly 20 (all available)
-        assert len(result) == 20
+        # Assert: One dict per claimed row, in query order, with exact keys
+        assert result == [
+            {"zip": f"850{i:02d}", "page": i % 3 + 1, "q": f"850{i:02d} bars",
+             "claim_id": "claim-rows-123"}
+            for i in range(claimed)
+        ]
 
-        # Assert: All returned queries have correct structure
-        for i, query in enumerate(result):
-            assert query["zip"] == f"8500{i:02d}"
-            assert query["page"] == 1
-            assert query["claim_id"] == "claim-partial-789"
+        # Assert: Correct types
+        for query in result:
+            assert isinstance(query["zip"], str)
+            assert isinstance(query["page"], int)
+            assert isinstance(query["q"], str)
+            assert isinstance(query["claim_id"], str)
 
-        # Assert: Verify batch_size=50 was passed to UPDATE
+        # Assert: The requested batch_size (not the claimed count) bounds the UPDATE
         dml_params = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in dml_params}
-        assert param_dict["batch_size"] == 50
+        param_dict = params_by_name(dml_params)
+        assert param_dict["batch_size"].value == batch_size
 
     def test_dequeue_claim_uniqueness(
         self, mock_execute_dml, mock_execute_query, sample_bigquery_row
@@ -208,6 +263,45 @@ class TestDequeueBatch:
         assert claim_id_1.startswith("claim-")
         assert claim_id_2.startswith("claim-")
 
+    def test_dequeue_concurrent_claims_stay_separate(
+        self, mock_execute_dml, mock_execute_query, sample_bigquery_row
+    ):
+        """Test that concurrent dequeues never share or cross claim_ids.
+
+        Batch processors dequeue from several threads at once. Each call must
+        claim with its own claim_id and SELECT back only that claim, so no two
+        workers ever process the same batch.
+        """
+        # Arrange: UPDATE records each claim; SELECT echoes the claim it was asked for
+        lock = threading.Lock()
+        claimed = []
+
+        def claim(query, parameters):
+            with lock:
+                claimed.append(params_by_name(parameters)["claim_id"].value)
+            return 1
+
+        def select_claimed(query, parameters):
+            claim_id = params_by_name(parameters)["claim_id"].value
+            return [sample_bigquery_row(zip="85001", page=1, q="85001 bars", claim_id=claim_id)]
+
+        mock_execute_dml.side_effect = claim
+        mock_execute_query.side_effect = select_claimed
+
+        # Act: 64 dequeues across 16 threads
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(
+                lambda _: dequeue_batch(job_id="concurrent-job", batch_size=1), range(64)
+            ))
+
+        # Assert: Every claim_id is unique
+        assert len(claimed) == 64
+        assert len(set(claimed)) == 64
+
+        # Assert: Each worker got back exactly the batch it claimed
+        returned = [result[0]["claim_id"] for result in results]
+        assert sorted(returned) == sorted(claimed)
+
     def test_dequeue_ordering(
         self, mock_execute_dml, mock_execute_query, sample_bigquery_row
     ):
@@ -260,47 +354,6 @@ class TestDequeueBatch:
         assert "WHERE job_id = @job_id" in update_query
         assert "AND status = 'queued'" in update_query
 
-    def test_dequeue_return_structure(
-        self, mock_execute_dml, mock_execute_query, sample_bigquery_row
-    ):
-        """Test that returned dictionaries have the correct structure.
-
-        Each returned query must have exactly 4 keys: zip, page, q, claim_id.
-        This contract is relied upon by the batch processing flow.
-        """
-        # Arrange: Mock single query result
-        mock_execute_dml.return_value = 1
-        mock_execute_query.return_value = [
-            sample_bigquery_row(
-                zip="85001",
-                page=2,
-                q="85001 bars",
-                claim_id="claim-test-999"
-            )
-        ]
-
-        # Act: Dequeue
-        result = dequeue_batch(job_id="test-job", batch_size=1)
-
-        # Assert: Single query returned
-        assert len(result) == 1
-        query = result[0]
-
-        # Assert: Correct keys present
-        assert set(query.keys()) == {"zip", "page", "q", "claim_id"}
-
-        # Assert: Correct types
-        assert isinstance(query["zip"], str)
-        assert isinstance(query["page"], int)
-        assert isinstance(query["q"], str)
-        assert isinstance(query["claim_id"], str)
-
-        # Assert: Correct values
-        assert query["zip"] == "85001"
-        assert query["page"] == 2
-        assert query["q"] == "85001 bars"
-        assert query["claim_id"] == "claim-test-999"
-
     def test_dequeue_uses_scalar_query_parameters(
         self, mock_execute_dml, mock_execute_query
     ):
@@ -322,13 +375,13 @@ class TestDequeueBatch:
         assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in params)
 
         # Verify parameter types
-        param_dict = {p.name: (p.type_, p.value) for p in params}
-        assert param_dict["job_id"][0] == "STRING"
-        assert param_dict["batch_size"][0] == "INT64"
-        assert param_dict["claim_id"][0] == "STRING"
+        param_dict = params_by_name(params)
+        assert param_dict["job_id"].type_ == "STRING"
+        assert param_dict["batch_size"].type_ == "INT64"
+        assert param_dict["claim_id"].type_ == "STRING"
 
         # Verify dangerous string is safely parameterized
-        assert param_dict["job_id"][1] == "sql-injection-test'; DROP TABLE serper_queries;--"
+        assert param_dict["job_id"].value == "sql-injection-test'; DROP TABLE serper_queries;--"
 
 
 class TestBatchUpdateQueryStatuses:
@@ -401,41 +454,21 @@ class TestBatchUpdateQueryStatuses:
         query = call_args[0][0]
         parameters = call_args[0][1]
 
-        # Assert: MERGE statement structure
-        assert "MERGE" in query
-        assert "serper_queries" in query
-        assert "AS target" in query
-        assert "AS source" in query
-
-        # Assert: UNNEST pattern for batching
-        assert "UNNEST" in query
-        assert "STRUCT<" in query
-
-        # Assert: MERGE ON clause (matches on job_id, zip, page)
-        assert "ON target.job_id = source.job_id" in query
-        assert "AND target.zip = source.zip" in query
-        assert "AND target.page = source.page" in query
-
-        # Assert: WHEN MATCHED THEN UPDATE clause
-        assert "WHEN MATCHED THEN" in query
-        assert "UPDATE SET" in query
+        # Assert: MERGE structure, UNNEST batching, ON clause and UPDATE SET
+        assert_contains_all(query, BATCH_UPDATE_SQL_TOKENS)
 
-        # Assert: UPDATE sets all status fields
-        assert "status = source.status" in query
-        assert "api_status = source.api_status" in query
-        assert "results_count = source.results_count" in query
-        assert "credits = source.credits" in query
-        assert "error = source.error" in query
-        assert "ran_at = CURRENT_TIMESTAMP()" in query
+        # Assert: job_id scalar plus one struct-array parameter
+        assert len(parameters) == 2
 
         # Assert: Function returns rows affected
         assert result == 4
 
     def test_batch_update_parameter_validation(self, mock_execute_dml):
-        """Test that all parameters use correct BigQuery ScalarQueryParameter types.
+        """Test that all parameters use correct BigQuery parameter types.
 
         This verifies SQL injection protection and correct type handling for
-        the batched operation. Each update generates 7 parameters.
+        the batched operation. Each update becomes one STRUCT with 7 fields
+        inside the @updates ARRAY parameter.
         """
         # Arrange: Create 2 updates with different field combinations
         updates = [
@@ -468,51 +501,52 @@ class TestBatchUpdateQueryStatuses:
         # Assert: Extract parameters
         parameters = mock_execute_dml.call_args[0][1]
 
-        # Assert: All parameters are ScalarQueryParameter instances
-        assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in parameters)
-
-        # Assert: Verify parameter count
-        # 1 shared (job_id) + 7 per update × 2 updates = 15 parameters
-        assert len(parameters) == 1 + (7 * 2)
-
-        # Build parameter dict for type checking
-        param_dict = {p.name: (p.type_, p.value) for p in parameters}
-
-        # Assert: Shared parameter type
-        assert param_dict["job_id"][0] == "STRING"
-        assert param_dict["job_id"][1] == "param-test-job"
-
-        # Assert: First update parameter types (index 0)
-        assert param_dict["zip_0"][0] == "STRING"
-        assert param_dict["zip_0"][1] == "85001"
-        assert param_dict["page_0"][0] == "INT64"
-        assert param_dict["page_0"][1] == 1
-        assert param_dict["status_0"][0] == "STRING"
-        assert param_dict["status_0"][1] == "success"
-        assert param_dict["api_status_0"][0] == "INT64"
-        assert param_dict["api_status_0"][1] == 200
-        assert param_dict["results_count_0"][0] == "INT64"
-        assert param_dict["results_count_0"][1] == 10
-        assert param_dict["credits_0"][0] == "INT64"
-        assert param_dict["credits_0"][1] == 1
-        assert param_dict["error_0"][0] == "STRING"
-        assert param_dict["error_0"][1] is None
-
-        # Assert: Second update parameter types (index 1)
-        assert param_dict["zip_1"][0] == "STRING"
-        assert param_dict["zip_1"][1] == "85002"
-        assert param_dict["page_1"][0] == "INT64"
-        assert param_dict["page_1"][1] == 2
-        assert param_dict["status_1"][0] == "STRING"
-        assert param_dict["status_1"][1] == "failed"
-        assert param_dict["api_status_1"][0] == "INT64"
-        assert param_dict["api_status_1"][1] == 500
-        assert param_dict["results_count_1"][0] == "INT64"
-        assert param_dict["results_count_1"][1] == 0
-        assert param_dict["credits_1"][0] == "INT64"
-        assert param_dict["credits_1"][1] == 0
-        assert param_dict["error_1"][0] == "STRING"
-        assert param_dict["error_1"][1] == "Timeout"
+        # Assert: Shared job_id scalar + one ARRAY<STRUCT> of updates
+        assert len(parameters) == 2
+        job_id_param, updates_param = parameters
+        assert isinstance(job_id_param, bigquery.ScalarQueryParameter)
+        assert job_id_param.name == "job_id"
+        assert job_id_param.type_ == "STRING"
+        assert job_id_param.value == "param-test-job"
+
+        assert isinstance(updates_param, bigquery.ArrayQueryParameter)
+        assert updates_param.name == "updates"
+        assert len(updates_param.values) == 2
+        assert all(isinstance(v, bigquery.StructQueryParameter) for v in updates_param.values)
+
+        # Assert: STRUCT field types (shared by every row)
+        first, second = updates_param.values
+        assert first.struct_types == {
+            "zip": "STRING",
+            "page": "INT64",
+            "status": "STRING",
+            "api_status": "INT64",
+            "results_count": "INT64",
+            "credits": "INT64",
+            "error": "STRING",
+        }
+
+        # Assert: First update values (index 0)
+        assert first.struct_values == {
+            "zip": "85001",
+            "page": 1,
+            "status": "success",
+            "api_status": 200,
+            "results_count": 10,
+            "credits": 1,
+            "error": None,
+        }
+
+        # Assert: Second update values (index 1)
+        assert second.struct_values == {
+            "zip": "85002",
+            "page": 2,
+            "status": "failed",
+            "api_status": 500,
+            "results_count": 0,
+            "credits": 0,
+            "error": "Timeout",
+        }
 
     def test_batch_update_empty_list_raises_error(self, mock_execute_dml):
         """Test that empty updates list raises ValueError.
@@ -531,6 +565,24 @@ class TestBatchUpdateQueryStatuses:
         # Assert: execute_dml was NOT called (early validation)
         assert mock_execute_dml.call_count == 0
 
+    @pytest.mark.parametrize("missing", ["zip", "page", "status"])
+    def test_batch_update_missing_required_field_raises(self, mock_execute_dml, missing):
+        """Test that an update without zip, page or status is rejected.
+
+        Binding NULL for these would make the MERGE match nothing (zip, page)
+        or write status = NULL, so a malformed update must fail loudly.
+        """
+        # Arrange: Otherwise complete update with one required key removed
+        update = {"zip": "85001", "page": 1, "status": "success"}
+        del update[missing]
+
+        # Act & Assert
+        with pytest.raises(KeyError, match=missing):
+            batch_update_query_statuses(job_id="missing-field-job", updates=[update])
+
+        # Assert: Nothing was written
+        assert mock_execute_dml.call_count == 0
+
     def test_batch_update_optional_fields_none(self, mock_execute_dml):
         """Test handling of optional fields when they are None.
 
@@ -560,26 +612,27 @@ class TestBatchUpdateQueryStatuses:
         # Act: Batch update with minimal fields
         batch_update_query_statuses(job_id="minimal-job", updates=updates)
 
-        # Assert: Parameters include None values for optional fields
-        parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
+        # Assert: Struct rows include None values for optional fields
+        updates_param = mock_execute_dml.call_args[0][1][1]
+        first, second = (v.struct_values for v in updates_param.values)
 
         # First update: all optional fields should be None
-        assert param_dict.get("api_status_0") is None
-        assert param_dict.get("results_count_0") is None
-        assert param_dict.get("credits_0") is None
-        assert param_dict.get("error_0") is None
+        assert first["api_status"] is None
+        assert first["results_count"] is None
+        assert first["credits"] is None
+        assert first["error"] is None
 
         # Second update: only error is populated
-        assert param_dict.get("api_status_1") is None
-        assert param_dict.get("results_count_1") is None
-        assert param_dict.get("credits_1") is None
-        assert param_dict.get("error_1") == "Some error"
+        assert second["api_status"] is None
+        assert second["results_count"] is None
+        assert second["credits"] is None
+        assert second["error"] == "Some error"
 
     def test_batch_update_struct_declaration(self, mock_execute_dml):
         """Test that STRUCT declaration matches UPDATE columns.
 
-        The STRUCT in UNNEST must declare all columns with correct types.
+        The @updates ARRAY<STRUCT> parameter must declare all columns with
+        correct types, and the source SELECT must expose each of them.
         """
         # Arrange: Create single update
         updates = [
@@ -600,24 +653,31 @@ class TestBatchUpdateQueryStatuses:
         # Act: Batch update
         batch_update_query_statuses(job_id="struct-job", updates=updates)
 
-        # Assert: Extract query
-        query = mock_execute_dml.call_args[0][0]
+        # Assert: Extract query and the struct-array parameter
+        query, parameters = mock_execute_dml.call_args[0]
+        struct_type = parameters[1].array_type
 
         # Assert: STRUCT declaration includes all column types
-        assert "STRUCT<" in query
-        assert "job_id STRING" in query
-        assert "zip STRING" in query
-        assert "page INT64" in query
-        assert "status STRING" in query
-        assert "api_status INT64" in query
-        assert "results_count INT64" in query
-        assert "credits INT64" in query
-        assert "error STRING" in query
+        assert isinstance(struct_type, bigquery.StructQueryParameterType)
+        assert [(f.name, f.to_api_repr()["type"]) for f in struct_type.fields] == [
+            ("zip", "STRING"),
+            ("page", "INT64"),
+            ("status", "STRING"),
+            ("api_status", "INT64"),
+            ("results_count", "INT64"),
+            ("credits", "INT64"),
+            ("error", "STRING"),
+        ]
+
+        # Assert: job_id comes from the shared scalar, other columns from the struct
+        assert "@job_id AS job_id" in query
+        for column in ("zip", "page", "status", "api_status", "results_count", "credits", "error"):
+            assert f"u.{column}" in query
 
     def test_batch_update_values_clause_count(self, mock_execute_dml):
-        """Test that VALUES clause contains correct number of entries.
+        """Test that the @updates array contains correct number of entries.
 
-        For N updates, the UNNEST should contain exactly N STRUCT entries.
+        For N updates, the UNNEST should read exactly N STRUCT entries.
         """
         # Arrange: Create 3 updates
         updates = [
@@ -635,19 +695,15 @@ class TestBatchUpdateQueryStatuses:
         # Act: Batch update
         batch_update_query_statuses(job_id="values-job", updates=updates)
 
-        # Assert: Extract query
-        query = mock_execute_dml.call_args[0][0]
+        # Assert: Extract struct-array parameter
+        updates_param = mock_execute_dml.call_args[0][1][1]
 
-        # Assert: Query contains parameter references for all 3 updates
-        # Each update has 7 parameters: zip, page, status, api_status, results_count, credits, error
-        for i in range(3):
-            assert f"@zip_{i}" in query
-            assert f"@page_{i}" in query
-            assert f"@status_{i}" in query
-            assert f"@api_status_{i}" in query
-            assert f"@results_count_{i}" in query
-            assert f"@credits_{i}" in query
-            assert f"@error_{i}" in query
+        # Assert: One STRUCT per update, in input order
+        # Each struct has 7 fields: zip, page, status, api_status, results_count, credits, error
+        assert len(updates_param.values) == 3
+        for i, value in enumerate(updates_param.values):
+            assert value.struct_values["zip"] == updates[i]["zip"]
+            assert len(value.struct_values) == 7
 
     def test_batch_update_sql_injection_protection(self, mock_execute_dml):
         """Test that parameterized queries prevent SQL injection.
@@ -678,17 +734,20 @@ class TestBatchUpdateQueryStatuses:
         )
 
         # Assert: Verify parameters are safely parameterized
-        parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
+        query, parameters = mock_execute_dml.call_args[0]
+        job_id_param, updates_param = parameters
+        row = updates_param.values[0].struct_values
 
         # The malicious strings should be safely stored as parameter values
-        assert param_dict["job_id"] == "test'; DELETE FROM serper_queries WHERE '1'='1"
-        assert param_dict["zip_0"] == "85001'; DROP TABLE serper_queries; --"
-        assert param_dict["status_0"] == "success'; DELETE FROM serper_queries WHERE '1'='1"
-        assert param_dict["error_0"] == "'; TRUNCATE TABLE serper_jobs; --"
-
-        # Verify all parameters are ScalarQueryParameter objects (safe)
-        assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in parameters)
+        assert job_id_param.value == "test'; DELETE FROM serper_queries WHERE '1'='1"
+        assert row["zip"] == "85001'; DROP TABLE serper_queries; --"
+        assert row["status"] == "success'; DELETE FROM serper_queries WHERE '1'='1"
+        assert row["error"] == "'; TRUNCATE TABLE serper_jobs; --"
+
+        # Verify values are bound parameters, never interpolated into the SQL
+        assert isinstance(job_id_param, bigquery.ScalarQueryParameter)
+        assert isinstance(updates_param, bigquery.ArrayQueryParameter)
+        assert "DROP TABLE" not in query
 
 
 class TestBatchSkipRemainingPages:
@@ -727,42 +786,13 @@ class TestBatchSkipRemainingPages:
         query = call_args[0][0]
         parameters = call_args[0][1]
 
-        # Assert: MERGE statement structure
-        assert "MERGE" in query
-        assert "serper_queries" in query
-        assert "AS target" in query
-        assert "AS source" in query
-
-        # Assert: UNNEST pattern for batching
-        assert "UNNEST" in query
-        assert "STRUCT<" in query
-
-        # Assert: STRUCT declaration includes all column types
-        assert "job_id STRING" in query
-        assert "zip STRING" in query
-        assert "page INT64" in query
-
-        # Assert: MERGE ON clause (matches on job_id, zip, page, and status='queued')
-        assert "ON target.job_id = source.job_id" in query
-        assert "AND target.zip = source.zip" in query
-        assert "AND target.page = source.page" in query
-        assert "AND target.status = 'queued'" in query
-
-        # Assert: WHEN MATCHED THEN UPDATE clause
-        assert "WHEN MATCHED THEN" in query
-        assert "UPDATE SET" in query
-
-        # Assert: UPDATE sets status to 'skipped' and error to 'early_exit_page1_lt10'
-        assert "status = 'skipped'" in query
-        assert "error = 'early_exit_page1_lt10'" in query
-        assert "ran_at = CURRENT_TIMESTAMP()" in query
+        # Assert: MERGE structure, STRUCT declaration, ON clause and UPDATE SET
+        assert_contains_all(query, BATCH_SKIP_SQL_TOKENS)
 
         # Assert: Query contains parameter references for all 4 zips, both pages
         # Each zip generates 2 UNNEST entries: (@job_id, @zip_i, 2), (@job_id, @zip_i, 3)
-        for i in range(4):
-            assert f"@zip_{i}" in query
-            # Should appear twice per zip (once for page 2, once for page 3)
-            assert query.count(f"@zip_{i}") == 2
+        # Each zip should appear exactly twice (once for page 2, once for page 3)
+        assert _zip_param_counts(query) == {f"zip_{i}": 2 for i in range(4)}
 
         # Assert: Query contains literal page numbers (2 and 3)
         # Each zip should have entries for both page 2 and page 3
@@ -799,17 +829,17 @@ class TestBatchSkipRemainingPages:
         assert len(parameters) == 1 + 2
 
         # Build parameter dict for type checking
-        param_dict = {p.name: (p.type_, p.value) for p in parameters}
+        param_dict = params_by_name(parameters)
 
         # Assert: Shared parameter type
-        assert param_dict["job_id"][0] == "STRING"
-        assert param_dict["job_id"][1] == "param-test-job"
+        assert param_dict["job_id"].type_ == "STRING"
+        assert param_dict["job_id"].value == "param-test-job"
 
         # Assert: Zip parameter types
-        assert param_dict["zip_0"][0] == "STRING"
-        assert param_dict["zip_0"][1] == "85001"
-        assert param_dict["zip_1"][0] == "STRING"
-        assert param_dict["zip_1"][1] == "85002"
+        assert param_dict["zip_0"].type_ == "STRING"
+        assert param_dict["zip_0"].value == "85001"
+        assert param_dict["zip_1"].type_ == "STRING"
+        assert param_dict["zip_1"].value == "85002"
 
     def test_batch_skip_empty_list_raises_error(self, mock_execute_dml):
         """Test that empty zips_to_skip list raises ValueError.
@@ -849,9 +879,8 @@ class TestBatchSkipRemainingPages:
         # Assert: Extract query
         query = mock_execute_dml.call_args[0][0]
 
-        # Assert: Query contains @zip_0 parameter (used twice, for page 2 and 3)
-        assert f"@zip_0" in query
-        assert query.count("@zip_0") == 2
+        # Assert: Query references only @zip_0, twice (for page 2 and 3)
+        assert _zip_param_counts(query) == {"zip_0": 2}
 
         # Assert: Query contains both page 2 and page 3
         assert ", 2)" in query
@@ -878,11 +907,9 @@ class TestBatchSkipRemainingPages:
         # Assert: Extract query
         query = mock_execute_dml.call_args[0][0]
 
-        # Assert: Query contains parameter references for all 3 zips
-        for i in range(3):
-            assert f"@zip_{i}" in query
-            # Each zip should appear exactly twice (page 2 and page 3)
-            assert query.count(f"@zip_{i}") == 2
+        # Assert: Query references all 3 zips and no others
+        # Each zip should appear exactly twice (page 2 and page 3)
+        assert _zip_param_counts(query) == {f"zip_{i}": 2 for i in range(3)}
 
         # Assert: Query contains 6 total page entries (2 per zip × 3 zips)
         # Count occurrences of ", 2)" and ", 3)" patterns
@@ -914,12 +941,12 @@ class TestBatchSkipRemainingPages:
 
         # Assert: Verify parameters are safely parameterized
         parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
+        param_dict = params_by_name(parameters)
 
         # The malicious strings should be safely stored as parameter values
-        assert param_dict["job_id"] == "test'; TRUNCATE TABLE serper_queries;--"
-        assert param_dict["zip_0"] == "85001'; DROP TABLE serper_queries; --"
-        assert param_dict["zip_1"] == "85002'; DELETE FROM serper_jobs WHERE '1'='1"
+        assert param_dict["job_id"].value == "test'; TRUNCATE TABLE serper_queries;--"
+        assert param_dict["zip_0"].value == "85001'; DROP TABLE serper_queries; --"
+        assert param_dict["zip_1"].value == "85002'; DELETE FROM serper_jobs WHERE '1'='1"
 
         # Verify all parameters are ScalarQueryParameter objects (safe)
         assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in parameters)
@@ -1026,23 +1053,23 @@ class TestEnqueueQueries:
         assert "'queued'" in query
 
         # Assert: Verify parameters
-        param_dict = {p.name: p.value for p in parameters}
+        param_dict = params_by_name(parameters)
 
         # Shared parameter
-        assert param_dict["job_id"] == "test-job-123"
+        assert param_dict["job_id"].value == "test-job-123"
 
         # Query-specific parameters (3 params per query: zip, page, q)
-        assert param_dict["zip_0"] == "85001"
-        assert param_dict["page_0"] == 1
-        assert param_dict["q_0"] == "85001 bars"
+        assert param_dict["zip_0"].value == "85001"
+        assert param_dict["page_0"].value == 1
+        assert param_dict["q_0"].value == "85001 bars"
 
-        assert param_dict["zip_1"] == "85001"
-        assert param_dict["page_1"] == 2
-        assert param_dict["q_1"] == "85001 bars"
+        assert param_dict["zip_1"].value == "85001"
+        assert param_dict["page_1"].value == 2
+        assert param_dict["q_1"].value == "85001 bars"
 
-        assert param_dict["zip_2"] == "85002"
-        assert param_dict["page_2"] == 1
-        assert param_dict["q_2"] == "85002 bars"
+        assert param_dict["zip_2"].value == "85002"
+        assert param_dict["page_2"].value == 1
+        assert param_dict["q_2"].value == "85002 bars"
 
         # Assert: Function returns rows affected
         assert result == 3
@@ -1163,27 +1190,27 @@ class TestEnqueueQueries:
         assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in parameters)
 
         # Build parameter dict for type checking
-        param_dict = {p.name: (p.type_, p.value) for p in parameters}
+        param_dict = params_by_name(parameters)
 
         # Assert: Shared parameter type
-        assert param_dict["job_id"][0] == "STRING"
-        assert param_dict["job_id"][1] == "types-test-job"
+        assert param_dict["job_id"].type_ == "STRING"
+        assert param_dict["job_id"].value == "types-test-job"
 
         # Assert: First query parameter types (index 0)
-        assert param_dict["zip_0"][0] == "STRING"
-        assert param_dict["zip_0"][1] == "85001"
-        assert param_dict["page_0"][0] == "INT64"
-        assert param_dict["page_0"][1] == 1
-        assert param_dict["q_0"][0] == "STRING"
-        assert param_dict["q_0"][1] == "85001 bars"
+        assert param_dict["zip_0"].type_ == "STRING"
+        assert param_dict["zip_0"].value == "85001"
+        assert param_dict["page_0"].type_ == "INT64"
+        assert param_dict["page_0"].value == 1
+        assert param_dict["q_0"].type_ == "STRING"
+        assert param_dict["q_0"].value == "85001 bars"
 
         # Assert: Second query parameter types (index 1)
-        assert param_dict["zip_1"][0] == "STRING"
-        assert param_dict["zip_1"][1] == "85002"
-        assert param_dict["page_1"][0] == "INT64"
-        assert param_dict["page_1"][1] == 2
-        assert param_dict["q_1"][0] == "STRING"
-        assert param_dict["q_1"][1] == "85002 bars"
+        assert param_dict["zip_1"].type_ == "STRING"
+        assert param_dict["zip_1"].value == "85002"
+        assert param_dict["page_1"].type_ == "INT64"
+        assert param_dict["page_1"].value == 2
+        assert param_dict["q_1"].type_ == "STRING"
+        assert param_dict["q_1"].value == "85002 bars"
 
     def test_enqueue_exact_chunk_boundary(self, mock_execute_dml):
         """Test behavior at exact chunk boundary (500 queries).
@@ -1293,12 +1320,12 @@ class TestEnqueueQueries:
 
         # Assert: Verify parameters are safely parameterized
         parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
+        param_dict = params_by_name(parameters)
 
         # The malicious strings should be safely stored as parameter values
-        assert param_dict["job_id"] == "test'; TRUNCATE TABLE serper_queries;--"
-        assert param_dict["zip_0"] == "85001'; DROP TABLE serper_queries; --"
-        assert param_dict["q_0"] == "bars'; DELETE FROM serper_jobs WHERE '1'='1"
+        assert param_dict["job_id"].value == "test'; TRUNCATE TABLE serper_queries;--"
+        assert param_dict["zip_0"].value == "85001'; DROP TABLE serper_queries; --"
+        assert param_dict["q_0"].value == "bars'; DELETE FROM serper_jobs WHERE '1'='1"
 
         # Verify all parameters are ScalarQueryParameter objects (safe)
         assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in parameters)
@@ -1456,13 +1483,13 @@ class TestUpdateQueryStatus:
 
         # Assert: Verify error parameter is correctly passed
         parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
+        param_dict = params_by_name(parameters)
 
-        assert param_dict["status"] == "failed"
-        assert param_dict["error"] == "API timeout after 30 seconds"
-        assert param_dict["api_status"] == 500
-        assert param_dict["results_count"] == 0
-        assert param_dict["credits"] == 0
+        assert param_dict["status"].value == "failed"
+        assert param_dict["error"].value == "API timeout after 30 seconds"
+        assert param_dict["api_status"].value == 500
+        assert param_dict["results_count"].value == 0
+        assert param_dict["credits"].value == 0
 
     def test_update_query_status_optional_fields_none(self, mock_execute_dml):
         """Test status update with optional fields as None.
@@ -1493,13 +1520,13 @@ class TestUpdateQueryStatus:
 
         # Assert: Verify all optional fields are None
         parameters = mock_execute_dml.call_args[0][1]
-        param_dict = {p.name: p.value for p in parameters}
+        param_dict = params_by_name(parameters)
 
-        assert param_dict["status"] == "processing"
-        assert param_dict["api_status"] is None
-        assert param_dict["results_count"] is None
-        assert param_dict["credits"] is None
-        assert param_dict["error"] is None
+        assert param_dict["status"].value == "processing"
+        assert param_dict["api_status"].value is None
+        assert param_dict["results_count"].value is None
+        assert param_dict["credits"].value is None
+        assert param_dict["error"].value is None
 
     def test_update_query_status_parameter_types(self, mock_execute_dml):
         """Test that all parameters use correct BigQuery types.
@@ -1523,16 +1550,16 @@ class TestUpdateQueryStatus:
         assert all(isinstance(p, bigquery.ScalarQueryParameter) for p in parameters)
 
         # Assert: Verify parameter types
-        param_dict = {p.name: p.type_ for p in parameters}
-
-        assert param_dict["job_id"] == "STRING"
-        assert param_dict["zip"] == "STRING"
-        assert param_dict["page"] == "INT64"
-        assert param_dict["status"] == "STRING"
-        assert param_dict["api_status"] == "INT64"
-        assert param_dict["results_count"] == "INT64"
-        assert param_dict["credits"] == "INT64"
-        assert param_dict["error"] == "STRING"
+        param_dict = params_by_name(parameters)
+
+        assert param_dict["job_id"].type_ == "STRING"
+        assert param_dict["zip"].type_ == "STRING"
+        assert param_dict["page"].type_ == "INT64"
+        assert param_dict["status"].type_ == "STRING"
+        assert param_dict["api_status"].type_ == "INT64"
+        assert param_dict["results_count"].type_ == "INT64"
+        assert param_dict["credits"].type_ == "INT64"
+        assert param_dict["error"].type_ == "STRING"
 
 
 class TestSkipRemainingPages:
@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.utils.timing import timing
+from src.utils.timing import flush_timing_summary, timing
 
 
 class TestTiming:
@@ -51,6 +51,15 @@ class TestTiming:
         # Should not have logged
         assert not mock_logger.return_value.info.called
 
+    @patch("src.utils.timing.get_run_logger")
+    def test_timing_below_threshold_skips_logger_lookup(self, mock_logger):
+        """Test that the run logger is not looked up when the entry is filtered out."""
+        with timing("fast operation", log_threshold_ms=100) as timing_data:
+            pass
+
+        mock_logger.assert_not_called()
+        assert timing_data["elapsed_ns"] > 0
+
     @patch("src.utils.timing.get_run_logger")
     def test_timing_exceeds_threshold(self, mock_logger):
         """Test that timing logs when exceeding threshold."""
@@ -113,3 +122,81 @@ class TestTiming:
 
         # elapsed_ms should still be set
         assert timing_data["elapsed_ms"] > 0
+
+    @patch("src.utils.timing.get_run_logger")
+    def test_timing_disabled_is_noop(self, mock_logger):
+        """Test that TIMING_ENABLED=false measures nothing and shares no state."""
+        with patch("src.utils.timing.settings") as mock_settings:
+            mock_settings.timing_enabled = False
+            with timing("disabled operation") as timing_data:
+                time.sleep(0.01)
+            with timing("other operation") as other_data:
+                pass
+
+        assert timing_data["elapsed_ms"] == 0
+        mock_logger.assert_not_called()
+
+        # Each call gets its own dict; a caller writing to one can't leak
+        timing_data["elapsed_ms"] = 5.0
+        assert other_data["elapsed_ms"] == 0
+
+    @patch("src.utils.timing.get_run_logger")
+    def test_timing_aggregate_buffers_and_summarizes(self, mock_logger):
+        """Test that TIMING_AGGREGATE=true buffers samples and logs one summary per operation."""
+        with patch("src.utils.timing.settings") as mock_settings:
+            mock_settings.timing_enabled = True
+            mock_settings.timing_aggregate = True
+            for _ in range(3):
+                with timing("MERGE"):
+                    pass
+            with timing("dequeue"):
+                pass
+
+            # Nothing logged per call while aggregating
+            assert not mock_logger.return_value.info.called
+
+            summary = flush_timing_summary()
+
+        assert summary["MERGE"]["count"] == 3
+        assert summary["dequeue"]["count"] == 1
+        assert summary["MERGE"]["min_ms"] <= summary["MERGE"]["p50_ms"] <= summary["MERGE"]["max_ms"]
+        assert mock_logger.return_value.info.call_count == 2
+
+        # Buffer is drained
+        assert flush_timing_summary() == {}
+
+    @patch("src.utils.timing.get_run_logger")
+    def test_timing_aggregate_groups_by_label(self, mock_logger):
+        """Test that per-call operation text is summarized under one stable label."""
+        with patch("src.utils.timing.settings") as mock_settings:
+            mock_settings.timing_enabled = True
+            mock_settings.timing_aggregate = True
+            for n in (3, 7, 12):
+                with timing(f"MERGE store {n} places", label="MERGE store places"):
+                    pass
+
+            summary = flush_timing_summary()
+
+        assert list(summary) == ["MERGE store places"]
+        assert summary["MERGE store places"]["count"] == 3
+        assert mock_logger.return_value.info.call_count == 1
+
+    @patch("src.utils.timing.get_run_logger")
+    def test_timing_aggregate_threshold_logs_slow_calls(self, mock_logger):
+        """Test that a threshold still logs slow calls individually while aggregating."""
+        with patch("src.utils.timing.settings") as mock_settings:
+            mock_settings.timing_enabled = True
+            mock_settings.timing_aggregate = True
+            with timing("fast operation", log_threshold_ms=100):
+                pass
+            with timing("slow operation", log_threshold_ms=10):
+                time.sleep(0.02)
+
+            # Only the slow call is logged on its own
+            assert mock_logger.return_value.info.call_count == 1
+            assert "slow operation" in str(mock_logger.return_value.info.call_args)
+
+            # Both calls are still in the summary
+            summary = flush_timing_summary()
+
+        assert set(summary) == {"fast operation", "slow operation"}
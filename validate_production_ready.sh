@@ -27,7 +27,7 @@ echo ""
 
 # Step 1: Run health check
 echo -e "${BLUE}[1/7] Running system health check...${NC}"
-if poetry run serper-health-check; then
+if poetry run serper-health-check --deep; then
     echo -e "${GREEN}✓ Health check passed${NC}"
 else
     echo -e "${RED}✗ Health check failed - Fix configuration before continuing${NC}"